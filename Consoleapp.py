@@ -1,32 +1,179 @@
+import queue
 import sqlite3
+import threading
 import time
-from datetime import datetime
+from concurrent.futures import Future
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
 from abc import ABC, abstractmethod
 
+import instrumentation
+from money import to_paise
+
 
 # Base class for common database operations (Abstraction)
 class DBEntity:
     def __init__(self, db):
         self.db = db
 
+    # Status messages for the console; silent when the Database is not verbose
+    def log(self, message):
+        if self.db.verbose:
+            print(message)
+
     def create(self, table, fields, values):
-        placeholders = ', '.join(['?'] * len(values))
-        sql = f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({placeholders});"
-        self.db.cursor.execute(sql, values)
-        self.db.connection.commit()
+        sql = self.db.statements.insert(table, fields)
+        with self.db.statements.timed(table):
+            self.db.execute(sql, values)
 
     def update(self, table, fields, values, condition, condition_values):
-        set_clause = ', '.join([f"{field} = ?" for field in fields])
-        sql = f"UPDATE {table} SET {set_clause} WHERE {condition};"
-        self.db.cursor.execute(sql, values + condition_values)
-        self.db.connection.commit()
+        sql = self.db.statements.update(table, fields, condition)
+        with self.db.statements.timed(table):
+            self.db.execute(sql, values + condition_values)
+
+    # Insert many rows with one prepared statement and a single commit
+    def create_many(self, table, fields, rows):
+        sql = self.db.statements.insert(table, fields)
+        with self.db.statements.timed(table):
+            self.db.executemany(sql, rows)
+
+    # Update many rows; each row is the field values followed by the condition values
+    def update_many(self, table, fields, condition, rows):
+        sql = self.db.statements.update(table, fields, condition)
+        with self.db.statements.timed(table):
+            self.db.executemany(sql, rows)
 
     def select(self, table, fields, condition=None, condition_values=None):
-        sql = f"SELECT {', '.join(fields)} FROM {table}"
-        if condition:
-            sql += f" WHERE {condition}"
-        self.db.cursor.execute(sql, condition_values or [])
-        return self.db.cursor.fetchall()
+        sql = self.db.statements.select(table, fields, [condition] if condition else [])
+        with self.db.statements.timed(table):
+            return self.db.query(sql, condition_values or []).fetchall()
+
+    # Stream rows one at a time from a dedicated cursor instead of fetchall().
+    # Only running the query is timed; the caller's iteration is not.
+    def iter_select(self, table, fields, filters=None, order_by=None):
+        conditions, values = self.build_filters(filters)
+        sql = self.db.statements.select(table, fields, conditions, order_by)
+        with self.db.statements.timed(table):
+            cursor = self.db.query(sql, values)
+        yield from cursor
+
+    # Keyset pagination: up to page_size rows ordered by key_fields that come
+    # strictly after the `after` key. Returns (rows, next_key); next_key is
+    # None on the last page.
+    def select_page(self, table, fields, key_fields, filters=None, after=None, page_size=50):
+        conditions, values = self.build_filters(filters)
+        if after is not None:
+            conditions.append(f"({', '.join(key_fields)}) > ({', '.join(['?'] * len(key_fields))})")
+            values.extend(after)
+        sql = self.db.statements.select(table, fields, conditions, key_fields, limit=True, checked=key_fields)
+        with self.db.statements.timed(table):
+            rows = self.db.query(sql, values + [page_size]).fetchall()
+        next_key = None
+        if len(rows) == page_size:
+            next_key = tuple(rows[-1][field] for field in key_fields)
+        return rows, next_key
+
+    # Filters are (condition, value) pairs; pairs whose value is None are skipped
+    def build_filters(self, filters):
+        conditions, values = [], []
+        for condition, value in filters or []:
+            if value is not None:
+                conditions.append(condition)
+                values.append(value)
+        return conditions, values
+
+
+# SQL for DBEntity's generic operations, built once per (operation, table,
+# fields, conditions) after the table and column names are checked against
+# the schema. Handing SQLite the identical string every time lets each
+# connection's statement cache (Database(cached_statements=...)) reuse the
+# prepared statement. Conditions and ORDER BY terms are trusted SQL from the
+# calling code and are not checked. Counts hits/misses and time per table.
+class StatementCache:
+    def __init__(self, db):
+        self.db = db
+        self.sql = {}
+        self.columns = {}
+        self.hits = 0
+        self.misses = 0
+        self.table_calls = {}
+        self.table_seconds = {}
+        self.lock = threading.Lock()
+
+    # Raises sqlite3.OperationalError, as SQLite itself would, for unknown names
+    def check(self, table, fields):
+        columns = self.columns.get(table)
+        if columns is None:
+            found = self.db.query("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?;",
+                                  [table]).fetchone()
+            if found is None:
+                raise sqlite3.OperationalError(f"no such table: {table}")
+            columns = self.columns[table] = {row["name"] for row in self.db.query(f'PRAGMA table_info("{table}");')}
+        unknown = [field for field in fields if field not in columns]
+        if unknown:
+            raise sqlite3.OperationalError(f"no such column in {table}: {', '.join(unknown)}")
+
+    def lookup(self, key, table, fields, build):
+        sql = self.sql.get(key)
+        if sql is not None:
+            with self.lock:
+                self.hits += 1
+            return sql
+        self.check(table, fields)
+        sql = self.sql[key] = build()
+        with self.lock:
+            self.misses += 1
+        return sql
+
+    def insert(self, table, fields):
+        return self.lookup(("insert", table, tuple(fields)), table, fields, lambda: (
+            f"INSERT INTO {table} ({', '.join(fields)}) VALUES ({', '.join(['?'] * len(fields))});"))
+
+    def update(self, table, fields, condition):
+        return self.lookup(("update", table, tuple(fields), condition), table, fields, lambda: (
+            f"UPDATE {table} SET {', '.join(f'{field} = ?' for field in fields)} WHERE {condition};"))
+
+    # checked: extra column names to validate (the keyset pagination keys)
+    def select(self, table, fields, conditions=(), order_by=None, limit=False, checked=()):
+        key = ("select", table, tuple(fields), tuple(conditions), tuple(order_by or ()), limit)
+
+        def build():
+            sql = f"SELECT {', '.join(fields)} FROM {table}"
+            if conditions:
+                sql += f" WHERE {' AND '.join(conditions)}"
+            if order_by:
+                sql += f" ORDER BY {', '.join(order_by)}"
+            return sql + (" LIMIT ?;" if limit else ";")
+        return self.lookup(key, table, list(fields) + list(checked), build)
+
+    @contextmanager
+    def timed(self, table):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if instrumentation.ENABLED:
+                instrumentation.record("db." + table, elapsed)
+            with self.lock:
+                self.table_calls[table] = self.table_calls.get(table, 0) + 1
+                self.table_seconds[table] = self.table_seconds.get(table, 0.0) + elapsed
+
+    def stats(self):
+        with self.lock:
+            return {
+                "statements": len(self.sql),
+                "hits": self.hits,
+                "misses": self.misses,
+                "tables": {table: {"calls": calls, "seconds": self.table_seconds[table]}
+                           for table, calls in sorted(self.table_calls.items())},
+            }
+
+    def reset_stats(self):
+        with self.lock:
+            self.hits = self.misses = 0
+            self.table_calls.clear()
+            self.table_seconds.clear()
 
 
 # Abstract Entity Class (Polymorphism)
@@ -40,13 +187,203 @@ class Entity(ABC):
         pass
 
 
+# Single writer thread owning the only write connection. Jobs are lists of
+# (sql, params, many) statements. Jobs queued together share one transaction
+# and one commit (group commit); a failing job is rolled back to its own
+# savepoint without affecting the others in the batch.
+class WriterQueue:
+    def __init__(self, connect, max_batch=256):
+        self.connect = connect
+        self.max_batch = max_batch
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="ledgermaster-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, statements):
+        future = Future()
+        self.queue.put((statements, future))
+        return future
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+
+    def run(self):
+        connection = self.connect()
+        connection.isolation_level = None  # Transactions are managed explicitly below
+        stopping = False
+        while not stopping:
+            job = self.queue.get()
+            if job is None:
+                break
+            batch = [job]
+            while len(batch) < self.max_batch:
+                try:
+                    job = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stopping = True
+                    break
+                batch.append(job)
+            self.apply(connection, batch)
+        connection.close()
+
+    def apply(self, connection, batch):
+        outcomes = []
+        try:
+            connection.execute("BEGIN IMMEDIATE;")
+            for statements, future in batch:
+                connection.execute("SAVEPOINT job;")
+                try:
+                    for sql, params, many in statements:
+                        if many:
+                            connection.executemany(sql, params)
+                        else:
+                            connection.execute(sql, params)
+                    connection.execute("RELEASE job;")
+                    outcomes.append((future, None))
+                except Exception as error:
+                    connection.execute("ROLLBACK TO job;")
+                    connection.execute("RELEASE job;")
+                    outcomes.append((future, error))
+            connection.execute("COMMIT;")
+        except sqlite3.Error as error:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK;")
+            outcomes = [(future, error) for _, future in batch]
+        for future, error in outcomes:
+            if error is None:
+                future.set_result(None)
+            else:
+                future.set_exception(error)
+
+
+# Hands each thread its own read connection (WAL lets readers run alongside
+# the writer) and funnels every write through one WriterQueue
+class ConnectionPool:
+    def __init__(self, db_path, timeout=10, cached_statements=256):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.readers = []
+        self.writer = WriterQueue(self.open_connection)
+
+    # check_same_thread is off only so close() can close every connection;
+    # each connection is still used by the thread that opened it
+    def open_connection(self):
+        connection = sqlite3.connect(self.db_path, timeout=self.timeout, check_same_thread=False,
+                                     cached_statements=self.cached_statements)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA busy_timeout = 3000;")
+        return connection
+
+    def reader(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = self.open_connection()
+            connection.execute("PRAGMA query_only = ON;")
+            self.local.connection = connection
+            with self.lock:
+                self.readers.append(connection)
+        return connection
+
+    def close(self):
+        self.writer.close()
+        with self.lock:
+            for connection in self.readers:
+                connection.close()
+            self.readers = []
+
+
 # Database connection and initialization
 class Database:
-    def __init__(self):
-        self.connection = sqlite3.connect('ledgermaster.db', timeout=10)  # Set timeout to 10 seconds
+    # cached_statements sizes sqlite3's per-connection prepared statement cache
+    def __init__(self, db_path='ledgermaster.db', pooled=False, verbose=True, cached_statements=256):
+        self.verbose = verbose
+        self.connection = sqlite3.connect(db_path, timeout=10,  # Set timeout to 10 seconds
+                                          cached_statements=cached_statements)
         self.connection.row_factory = sqlite3.Row  # Allow accessing columns by name
         self.cursor = self.connection.cursor()
+        self.transaction_depth = 0
+        self.local = threading.local()
         self.initialize_database()
+        self.statements = StatementCache(self)
+        self.pool = None
+        if pooled:
+            # Schema is ready; from here on reads use per-thread connections
+            # and writes go through the pool's single writer thread
+            self.connection.close()
+            self.connection = self.cursor = None
+            self.pool = ConnectionPool(db_path, cached_statements=cached_statements)
+
+    def execute(self, sql, params=()):
+        self.write(sql, params, False)
+
+    def executemany(self, sql, rows):
+        self.write(sql, rows, True)
+
+    def write(self, sql, params, many):
+        if self.pool is None:
+            if many:
+                self.cursor.executemany(sql, params)
+            else:
+                self.cursor.execute(sql, params)
+            self.commit()
+        elif getattr(self.local, "statements", None) is not None:
+            # Copy so later changes by the caller do not leak in; named parameters stay a mapping
+            self.local.statements.append((sql, params if isinstance(params, dict) else list(params), many))
+        else:
+            self.pool.writer.submit([(sql, params, many)]).result()
+
+    # Returns a cursor; pooled databases read on the calling thread's connection
+    def query(self, sql, params=()):
+        if self.pool is None:
+            return self.connection.execute(sql, params)
+        return self.pool.reader().execute(sql, params)
+
+    # Commit now unless a transaction() block is open; the block commits on exit
+    def commit(self):
+        if self.transaction_depth == 0:
+            self.connection.commit()
+
+    # Group many writes into one commit (one fsync), rolling back on error.
+    # Pooled databases buffer the block's writes per thread and hand them to
+    # the writer as one job, so reads inside the block do not see them yet.
+    @contextmanager
+    def transaction(self):
+        if self.pool is not None:
+            if getattr(self.local, "statements", None) is not None:
+                yield self  # Nested block joins the outer one
+                return
+            self.local.statements = []
+            try:
+                yield self
+                statements = self.local.statements
+            finally:
+                self.local.statements = None
+            if statements:
+                self.pool.writer.submit(statements).result()
+            return
+        self.transaction_depth += 1
+        try:
+            yield self
+        except Exception:
+            self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.connection.rollback()
+            raise
+        self.transaction_depth -= 1
+        if self.transaction_depth == 0:
+            self.connection.commit()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+        else:
+            self.connection.close()
 
     def initialize_database(self):
         self.cursor.execute("PRAGMA journal_mode=WAL;")
@@ -57,9 +394,20 @@ class Database:
             CREATE TABLE IF NOT EXISTS accounts (
                 account_name TEXT PRIMARY KEY,
                 account_type TEXT,
-                balance REAL
+                balance REAL,
+                opening_balance REAL DEFAULT 0,
+                balance_paise INTEGER DEFAULT 0,
+                opening_balance_paise INTEGER DEFAULT 0
             );
         """)
+        # Older databases predate postings: their balances become opening balances
+        if self.add_column_if_missing("accounts", "opening_balance", "REAL DEFAULT 0"):
+            self.cursor.execute("UPDATE accounts SET opening_balance = balance;")
+        # balance_paise is the exact INTEGER balance; balance is kept as its REAL copy
+        if self.add_column_if_missing("accounts", "balance_paise", "INTEGER DEFAULT 0"):
+            self.backfill_paise("accounts", "balance", "balance_paise")
+        if self.add_column_if_missing("accounts", "opening_balance_paise", "INTEGER DEFAULT 0"):
+            self.backfill_paise("accounts", "opening_balance", "opening_balance_paise")
         # Inventory table
         self.cursor.execute("""
             CREATE TABLE IF NOT EXISTS inventory (
@@ -107,8 +455,109 @@ class Database:
             );
         """)
 
+        # Double-entry postings: each row debits one account and credits another.
+        # accounts.balance is the materialized opening_balance + credits - debits.
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                posting_id INTEGER PRIMARY KEY,
+                voucher_number TEXT,
+                debit_account TEXT,
+                credit_account TEXT,
+                amount REAL,
+                date TEXT,
+                amount_paise INTEGER
+            );
+        """)
+        if self.add_column_if_missing("postings", "amount_paise", "INTEGER"):
+            self.backfill_paise("postings", "amount", "amount_paise")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_postings_debit ON postings (debit_account, date);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_postings_credit ON postings (credit_account, date);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_postings_voucher ON postings (voucher_number);")
+        # Closing balance of every account at the end of a closed period, so an
+        # as-of query replays only the postings dated after the latest snapshot
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS balance_snapshots (
+                account_name TEXT,
+                period_end TEXT,
+                balance_paise INTEGER,
+                PRIMARY KEY (account_name, period_end)
+            ) WITHOUT ROWID;
+        """)
+        # Covering index so the trial balance is a single index scan
+        self.cursor.execute("DROP INDEX IF EXISTS idx_accounts_type_balance;")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_accounts_type_balance_paise ON accounts (account_type, balance_paise);")
+
+        # Secondary indexes backing the filtered, keyset-paginated listings
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_vouchers_date ON vouchers (date, voucher_number);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_vouchers_type_date ON vouchers (voucher_type, date, voucher_number);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_voucher_log_date ON voucher_log (date, voucher_number);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_voucher_log_type_date ON voucher_log (voucher_type, date, voucher_number);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_bills_due_date ON bills (due_date, bill_number);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_bills_status_due_date ON bills (status, due_date, bill_number);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_bills_customer ON bills (customer_name, due_date, bill_number);")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_budgets_type ON budgets (budget_type, account_name);")
+
         self.connection.commit()
 
+    # Returns True when the column had to be added
+    def add_column_if_missing(self, table, column, declaration):
+        columns = [row["name"] for row in self.cursor.execute(f"PRAGMA table_info({table});")]
+        if column in columns:
+            return False
+        self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration};")
+        return True
+
+    # Fill a paise column from its REAL source with to_paise, so migrated rows
+    # round exactly like newly written ones (SQL ROUND rounds the binary value)
+    def backfill_paise(self, table, source, target):
+        rows = self.cursor.execute(f"SELECT rowid, {source} FROM {table};").fetchall()
+        self.cursor.executemany(f"UPDATE {table} SET {target} = ? WHERE rowid = ?;",
+                                [(None if value is None else to_paise(value), rowid) for rowid, value in rows])
+
+
+# Net movement in paise per account from postings, as one grouped query
+POSTING_TOTALS_SQL = """
+    SELECT account_name, SUM(delta) AS total FROM (
+        SELECT credit_account AS account_name, amount_paise AS delta FROM postings WHERE credit_account IS NOT NULL
+        UNION ALL
+        SELECT debit_account AS account_name, -amount_paise AS delta FROM postings WHERE debit_account IS NOT NULL
+    ) GROUP BY account_name
+"""
+
+# Moves an account by a number of paise; the REAL balance is derived from the
+# exact integer so it never accumulates float drift
+ADJUST_BALANCE_SQL = """
+    UPDATE accounts SET balance_paise = balance_paise + ?, balance = (balance_paise + ?) / 100.0
+    WHERE account_name = ?;
+"""
+
+OPENING_PAISE_SQL = "opening_balance_paise"
+
+# Net movement in paise per account from postings dated in (:after, :through]
+POSTING_TOTALS_BETWEEN_SQL = """
+    SELECT account_name, SUM(delta) AS total FROM (
+        SELECT credit_account AS account_name, amount_paise AS delta FROM postings
+        WHERE credit_account IS NOT NULL AND date > :after AND date <= :through
+        UNION ALL
+        SELECT debit_account AS account_name, -amount_paise AS delta FROM postings
+        WHERE debit_account IS NOT NULL AND date > :after AND date <= :through
+    ) GROUP BY account_name
+"""
+
+# One account's movement in (:after, :through], read from the (account, date) indexes
+ACCOUNT_MOVEMENT_SQL = """
+    SELECT COALESCE((SELECT SUM(amount_paise) FROM postings
+                     WHERE credit_account = :name AND date > :after AND date <= :through), 0)
+         - COALESCE((SELECT SUM(amount_paise) FROM postings
+                     WHERE debit_account = :name AND date > :after AND date <= :through), 0);
+"""
+
+
+# Dates are stored and compared as text, which only orders correctly for
+# zero-padded YYYY-MM-DD; anything else (e.g. 2024-3-5) raises ValueError
+def iso_date(value):
+    return date.fromisoformat(str(value)).isoformat()
+
 
 # Account Class inheriting DBEntity
 class Account(DBEntity):
@@ -116,13 +565,98 @@ class Account(DBEntity):
         super().__init__(db)  # Call the parent class constructor
 
     def create_account(self, account_name, account_type, balance):
-        self.create("accounts", ["account_name", "account_type", "balance"], 
-                    [account_name, account_type, balance])
-        print(f"Account '{account_name}' created successfully.")
+        paise = to_paise(balance)
+        self.create("accounts", ["account_name", "account_type", "balance", "opening_balance", "balance_paise",
+                                 "opening_balance_paise"],
+                    [account_name, account_type, balance, balance, paise, paise])
+        self.log(f"Account '{account_name}' created successfully.")
 
+    # A single-sided posting (no debit account) that adds to the balance
     def credit_account(self, account_name, amount):
-        self.update("accounts", ["balance"], [amount], "account_name = ?", [account_name])
-        print(f"Credited {amount} to {account_name}.")
+        paise = to_paise(amount)
+        with self.db.transaction():
+            self.create("postings", ["voucher_number", "debit_account", "credit_account", "amount", "amount_paise", "date"],
+                        [None, None, account_name, amount, paise, datetime.now().strftime('%Y-%m-%d')])
+            self.db.execute(ADJUST_BALANCE_SQL, [paise, paise, account_name])
+        self.log(f"Credited {amount} to {account_name}.")
+
+    # O(1) primary-key lookup of the materialized balance
+    def get_balance(self, account_name):
+        result = self.select("accounts", ["balance"], "account_name = ?", [account_name])
+        return result[0][0] if result else None
+
+    # Accounts whose stored balance differs from opening balance + postings.
+    # The comparison is on integer paise, so it is exact.
+    def verify_balances(self):
+        sql = f"""
+            SELECT account_name, balance, expected / 100.0 FROM (
+                SELECT a.account_name, a.balance, a.balance_paise, {OPENING_PAISE_SQL} + COALESCE(p.total, 0) AS expected
+                FROM accounts a LEFT JOIN ({POSTING_TOTALS_SQL}) p ON p.account_name = a.account_name
+            ) WHERE balance_paise != expected;
+        """
+        return self.db.query(sql).fetchall()
+
+    # Recompute every balance from postings in one transaction
+    def rebuild_balances(self):
+        with self.db.transaction():
+            self.db.execute(f"UPDATE accounts SET balance_paise = {OPENING_PAISE_SQL}, "
+                            f"balance = {OPENING_PAISE_SQL} / 100.0;")
+            self.db.execute(f"""
+                UPDATE accounts SET balance_paise = {OPENING_PAISE_SQL} + p.total,
+                                    balance = ({OPENING_PAISE_SQL} + p.total) / 100.0
+                FROM ({POSTING_TOTALS_SQL}) AS p WHERE accounts.account_name = p.account_name;
+            """)
+        self.log("Account balances rebuilt from postings.")
+
+    # Balance at the end of `as_of` (YYYY-MM-DD): the latest snapshot on or
+    # before that day plus the postings dated after it
+    def balance_as_of(self, account_name, as_of):
+        as_of = iso_date(as_of)
+        snapshot = self.db.query(
+            "SELECT period_end, balance_paise FROM balance_snapshots "
+            "WHERE account_name = ? AND period_end <= ? ORDER BY period_end DESC LIMIT 1;",
+            [account_name, as_of]).fetchone()
+        if snapshot is None:
+            opening = self.db.query(f"SELECT {OPENING_PAISE_SQL} FROM accounts WHERE account_name = ?;",
+                                    [account_name]).fetchone()
+            if opening is None:
+                return None
+            snapshot = ("", opening[0])
+        after, base = snapshot
+        movement = self.db.query(ACCOUNT_MOVEMENT_SQL,
+                                 {"name": account_name, "after": after, "through": as_of}).fetchone()[0]
+        return (base + movement) / 100.0
+
+    # Record every account's closing balance for a closed period, built from
+    # the previous snapshot plus the postings in between. Postings are dated
+    # when they are made, so only periods ending before today are closed.
+    def snapshot_balances(self, period_end=None):
+        today = datetime.now().strftime('%Y-%m-%d')
+        if period_end is None:  # Default: the last day of the previous month
+            period_end = (datetime.now().replace(day=1) - timedelta(days=1)).strftime('%Y-%m-%d')
+        period_end = iso_date(period_end)
+        if period_end >= today:
+            self.log("Only periods that ended before today can be snapshotted.")
+            return False
+        previous = self.db.query("SELECT MAX(period_end) FROM balance_snapshots WHERE period_end < ?;",
+                                 [period_end]).fetchone()[0] or ""
+        with self.db.transaction():
+            self.db.execute(f"""
+                INSERT OR REPLACE INTO balance_snapshots (account_name, period_end, balance_paise)
+                SELECT a.account_name, :through, COALESCE(s.balance_paise, {OPENING_PAISE_SQL}) + COALESCE(p.total, 0)
+                FROM accounts a
+                LEFT JOIN balance_snapshots s ON s.account_name = a.account_name AND s.period_end = :after
+                LEFT JOIN ({POSTING_TOTALS_BETWEEN_SQL}) p ON p.account_name = a.account_name;
+            """, {"after": previous, "through": period_end})
+        self.log(f"Balances snapshotted as of {period_end}.")
+        return True
+
+    # Exact totals per account type, summed in paise from the covering
+    # (account_type, balance_paise) index
+    def trial_balance(self):
+        sql = ("SELECT account_type, COUNT(*), SUM(balance_paise) / 100.0 FROM accounts "
+               "GROUP BY account_type ORDER BY account_type;")
+        return self.db.query(sql).fetchall()
         
     def view_account(self, account_name):
         result = self.select("accounts", ["account_name", "account_type", "balance"], 
@@ -142,10 +676,14 @@ class Inventory(DBEntity):
     def create_inventory_item(self, item_name, quantity, price):
         self.create("inventory", ["item_name", "quantity", "price"], 
                     [item_name, quantity, price])
-        print(f"Item '{item_name}' added to inventory.")
+        self.log(f"Item '{item_name}' added to inventory.")
+
+    def list_inventory(self, after=None, page_size=50):
+        return self.select_page("inventory", ["item_name", "quantity", "price"], ["item_name"],
+                                after=after, page_size=page_size)
 
     def view_inventory(self):
-        items = self.select("inventory", ["item_name", "quantity", "price"])
+        items = self.iter_select("inventory", ["item_name", "quantity", "price"], order_by=["item_name"])
         for item in items:
             print(f"Item: {item[0]} | Quantity: {item[1]} | Price: {item[2]}")
 
@@ -158,14 +696,25 @@ class Bill(DBEntity):
     def create_bill(self, bill_number, customer_name, amount_due, due_date):
         self.create("bills", ["bill_number", "customer_name", "amount_due", "due_date", "status"], 
                     [bill_number, customer_name, amount_due, due_date, "Unpaid"])
-        print(f"Bill #{bill_number} created successfully.")
+        self.log(f"Bill #{bill_number} created successfully.")
 
     def pay_bill(self, bill_number):
         self.update("bills", ["status"], ["Paid"], "bill_number = ?", [bill_number])
-        print(f"Bill #{bill_number} marked as paid.")
+        self.log(f"Bill #{bill_number} marked as paid.")
+
+    def bill_filters(self, status=None, customer_name=None, due_from=None, due_to=None):
+        return [("status = ?", status), ("customer_name = ?", customer_name),
+                ("due_date >= ?", due_from), ("due_date <= ?", due_to)]
+
+    def list_bills(self, status=None, customer_name=None, due_from=None, due_to=None, after=None, page_size=50):
+        return self.select_page("bills", ["bill_number", "customer_name", "amount_due", "due_date", "status"],
+                                ["due_date", "bill_number"],
+                                self.bill_filters(status, customer_name, due_from, due_to), after, page_size)
 
-    def view_bills(self):
-        bills = self.select("bills", ["bill_number", "customer_name", "amount_due", "due_date", "status"])
+    def view_bills(self, status=None, customer_name=None, due_from=None, due_to=None):
+        bills = self.iter_select("bills", ["bill_number", "customer_name", "amount_due", "due_date", "status"],
+                                 self.bill_filters(status, customer_name, due_from, due_to),
+                                 ["due_date", "bill_number"])
         for bill in bills:
             print(f"Bill #{bill[0]} | Customer: {bill[1]} | Amount: {bill[2]} | Due Date: {bill[3]} | Status: {bill[4]}")
 
@@ -178,14 +727,19 @@ class Budget(DBEntity):
     def set_budget(self, account_name, amount, budget_type):
         self.create("budgets", ["account_name", "budgeted_amount", "actual_amount", "budget_type"], 
                     [account_name, amount, 0, budget_type])
-        print(f"Budget for {account_name} set to {amount} ({budget_type}).")
+        self.log(f"Budget for {account_name} set to {amount} ({budget_type}).")
 
     def update_actual_in_budget(self, account_name, amount):
         self.update("budgets", ["actual_amount"], [amount], "account_name = ?", [account_name])
-        print(f"Updated actual amount for {account_name} by {amount}.")
+        self.log(f"Updated actual amount for {account_name} by {amount}.")
 
-    def view_budgets(self):
-        budgets = self.select("budgets", ["account_name", "budgeted_amount", "actual_amount", "budget_type"])
+    def list_budgets(self, budget_type=None, after=None, page_size=50):
+        return self.select_page("budgets", ["account_name", "budgeted_amount", "actual_amount", "budget_type"],
+                                ["account_name"], [("budget_type = ?", budget_type)], after, page_size)
+
+    def view_budgets(self, budget_type=None):
+        budgets = self.iter_select("budgets", ["account_name", "budgeted_amount", "actual_amount", "budget_type"],
+                                   [("budget_type = ?", budget_type)], ["account_name"])
         for budget in budgets:
             print(f"Account: {budget[0]} | Budgeted: {budget[1]} | Actual: {budget[2]} | Type: {budget[3]}")
 
@@ -198,15 +752,49 @@ class Voucher(DBEntity):
     def create_voucher(self, voucher_number, voucher_type, amount):
         self.create("vouchers", ["voucher_number", "voucher_type", "amount", "date"], 
                     [voucher_number, voucher_type, amount, datetime.now().strftime('%Y-%m-%d')])
-        print(f"Voucher #{voucher_number} created successfully.")
+        self.log(f"Voucher #{voucher_number} created successfully.")
+
+    # Double-entry voucher: debit one account, credit another, all in one commit
+    def post_voucher(self, voucher_number, voucher_type, amount, debit_account, credit_account):
+        found = self.select("accounts", ["account_name"], "account_name IN (?, ?)", [debit_account, credit_account])
+        if len({row[0] for row in found}) != len({debit_account, credit_account}):
+            self.log("Both accounts must exist to post a voucher.")
+            return False
+        date = datetime.now().strftime('%Y-%m-%d')
+        paise = to_paise(amount)
+        with self.db.transaction():
+            self.create("vouchers", ["voucher_number", "voucher_type", "amount", "date"],
+                        [voucher_number, voucher_type, amount, date])
+            self.create("postings", ["voucher_number", "debit_account", "credit_account", "amount", "amount_paise", "date"],
+                        [voucher_number, debit_account, credit_account, amount, paise, date])
+            self.db.execute(ADJUST_BALANCE_SQL, [-paise, -paise, debit_account])
+            self.db.execute(ADJUST_BALANCE_SQL, [paise, paise, credit_account])
+        self.log(f"Voucher #{voucher_number} posted: {debit_account} Dr {amount}, {credit_account} Cr {amount}.")
+        return True
+
+    def voucher_filters(self, voucher_type=None, date_from=None, date_to=None):
+        return [("voucher_type = ?", voucher_type), ("date >= ?", date_from), ("date <= ?", date_to)]
 
-    def view_vouchers(self):
-        vouchers = self.select("vouchers", ["voucher_number", "voucher_type", "amount", "date"])
+    def list_vouchers(self, voucher_type=None, date_from=None, date_to=None, after=None, page_size=50,
+                      table="vouchers"):
+        return self.select_page(table, ["voucher_number", "voucher_type", "amount", "date"],
+                                ["date", "voucher_number"],
+                                self.voucher_filters(voucher_type, date_from, date_to), after, page_size)
+
+    def list_voucher_log(self, voucher_type=None, date_from=None, date_to=None, after=None, page_size=50):
+        return self.list_vouchers(voucher_type, date_from, date_to, after, page_size, table="voucher_log")
+
+    def view_vouchers(self, voucher_type=None, date_from=None, date_to=None):
+        vouchers = self.iter_select("vouchers", ["voucher_number", "voucher_type", "amount", "date"],
+                                    self.voucher_filters(voucher_type, date_from, date_to),
+                                    ["date", "voucher_number"])
         for voucher in vouchers:
             print(f"Voucher #{voucher[0]} | Type: {voucher[1]} | Amount: {voucher[2]} | Date: {voucher[3]}")
 
-    def view_voucher_log(self):
-        log = self.select("voucher_log", ["voucher_number", "voucher_type", "amount", "date"])
+    def view_voucher_log(self, voucher_type=None, date_from=None, date_to=None):
+        log = self.iter_select("voucher_log", ["voucher_number", "voucher_type", "amount", "date"],
+                               self.voucher_filters(voucher_type, date_from, date_to),
+                               ["date", "voucher_number"])
         for entry in log:
             print(f"Voucher #{entry[0]} | Type: {entry[1]} | Amount: {entry[2]} | Date: {entry[3]}")
 
@@ -248,12 +836,34 @@ class LedgerMasterApp:
             else:
                 print("Invalid choice, please try again.")
 
+    # Blank input means the filter is not applied
+    def optional_input(self, prompt):
+        value = input(prompt).strip()
+        return value or None
+
+    # Print a keyset-paginated listing one page at a time
+    def page_through(self, fetch_page, format_row):
+        after = None
+        while True:
+            rows, after = fetch_page(after)
+            for row in rows:
+                print(format_row(row))
+            if after is None:
+                break
+            if input("Press Enter for the next page or 'q' to stop: ").strip().lower() == 'q':
+                break
+
     def account_menu(self):
         while True:
             print("\nAccount Menu")
             print("1. Create Account")
             print("2. View Account")
-            print("3. Back")
+            print("3. Trial Balance")
+            print("4. Verify Balances")
+            print("5. Rebuild Balances from Postings")
+            print("6. Balance as of Date")
+            print("7. Snapshot Balances for a Closed Period")
+            print("8. Back")
             choice = input("Enter your choice: ")
 
             if choice == '1':
@@ -265,6 +875,31 @@ class LedgerMasterApp:
                 name = input("Enter account name: ")
                 self.account.view_account(name)
             elif choice == '3':
+                for account_type, count, total in self.account.trial_balance():
+                    print(f"Type: {account_type} | Accounts: {count} | Balance: {total}")
+            elif choice == '4':
+                mismatches = self.account.verify_balances()
+                for name, stored, expected in mismatches:
+                    print(f"Account: {name} | Stored: {stored} | From postings: {expected}")
+                print(f"{len(mismatches)} account(s) out of balance.")
+            elif choice == '5':
+                self.account.rebuild_balances()
+            elif choice == '6':
+                name = input("Enter account name: ")
+                as_of = input("Enter date (YYYY-MM-DD): ")
+                try:
+                    balance = self.account.balance_as_of(name, as_of)
+                except ValueError as error:
+                    print(f"Invalid date: {error}")
+                    continue
+                print("Account not found." if balance is None else f"Balance of {name} on {as_of}: {balance}")
+            elif choice == '7':
+                period_end = self.optional_input("Enter period end (YYYY-MM-DD, blank for last month end): ")
+                try:
+                    self.account.snapshot_balances(period_end)
+                except ValueError as error:
+                    print(f"Invalid date: {error}")
+            elif choice == '8':
                 break
             else:
                 print("Invalid choice, please try again.")
@@ -295,7 +930,8 @@ class LedgerMasterApp:
             print("1. Create Bill")
             print("2. Pay Bill")
             print("3. View Bills")
-            print("4. Back")
+            print("4. Search Bills")
+            print("5. Back")
             choice = input("Enter your choice: ")
 
             if choice == '1':
@@ -310,6 +946,14 @@ class LedgerMasterApp:
             elif choice == '3':
                 self.bill.view_bills()
             elif choice == '4':
+                status = self.optional_input("Status (Paid/Unpaid, blank for any): ")
+                customer_name = self.optional_input("Customer name (blank for any): ")
+                due_from = self.optional_input("Due from (YYYY-MM-DD, blank for any): ")
+                due_to = self.optional_input("Due to (YYYY-MM-DD, blank for any): ")
+                self.page_through(
+                    lambda after: self.bill.list_bills(status, customer_name, due_from, due_to, after),
+                    lambda bill: f"Bill #{bill[0]} | Customer: {bill[1]} | Amount: {bill[2]} | Due Date: {bill[3]} | Status: {bill[4]}")
+            elif choice == '5':
                 break
             else:
                 print("Invalid choice, please try again.")
@@ -345,7 +989,9 @@ class LedgerMasterApp:
             print("1. Create Voucher")
             print("2. View Vouchers")
             print("3. View Voucher Log")
-            print("4. Back")
+            print("4. Search Vouchers")
+            print("5. Post Voucher (Debit/Credit)")
+            print("6. Back")
             choice = input("Enter your choice: ")
 
             if choice == '1':
@@ -358,6 +1004,20 @@ class LedgerMasterApp:
             elif choice == '3':
                 self.voucher.view_voucher_log()
             elif choice == '4':
+                voucher_type = self.optional_input("Voucher type (blank for any): ")
+                date_from = self.optional_input("From date (YYYY-MM-DD, blank for any): ")
+                date_to = self.optional_input("To date (YYYY-MM-DD, blank for any): ")
+                self.page_through(
+                    lambda after: self.voucher.list_vouchers(voucher_type, date_from, date_to, after),
+                    lambda voucher: f"Voucher #{voucher[0]} | Type: {voucher[1]} | Amount: {voucher[2]} | Date: {voucher[3]}")
+            elif choice == '5':
+                voucher_number = input("Enter voucher number: ")
+                voucher_type = input("Enter voucher type: ")
+                amount = float(input("Enter amount: "))
+                debit_account = input("Enter account to debit: ")
+                credit_account = input("Enter account to credit: ")
+                self.voucher.post_voucher(voucher_number, voucher_type, amount, debit_account, credit_account)
+            elif choice == '6':
                 break
             else:
                 print("Invalid choice, please try again.")
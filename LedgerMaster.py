@@ -1,9 +1,25 @@
-import json
-
+import atexit
+import os
+import sys
+import threading
+
+import instrumentation
+import ledger_codec
+from ledger_index import AccountIndex, NameIndex
+from money import SCALE
+
+# Snapshot format 2 stores each record as a row in this column order
+ACCOUNT_FIELDS = ["account_name", "account_type", "balance"]
+INVENTORY_FIELDS = ["item_name", "item_price", "item_quantity"]
+
+# Domain objects use __slots__ (no per-instance __dict__) and intern their
+# type labels, so millions of accounts share one copy of "Asset", "Income", ...
 class LedgerAccount:
+    __slots__ = ("account_name", "account_type", "balance")
+
     def __init__(self, account_name, account_type, balance=0.0):
         self.account_name = account_name
-        self.account_type = account_type
+        self.account_type = sys.intern(account_type)
         self.balance = balance
 
     def credit(self, amount):
@@ -22,7 +38,12 @@ class LedgerAccount:
             "balance": self.balance
         }
 
+    def to_row(self):
+        return [self.account_name, self.account_type, self.balance]
+
 class InventoryItem:
+    __slots__ = ("item_name", "item_price", "item_quantity")
+
     def __init__(self, item_name, item_price, item_quantity=0):
         self.item_name = item_name
         self.item_price = item_price
@@ -38,32 +59,82 @@ class InventoryItem:
             "item_quantity": self.item_quantity
         }
 
+    def to_row(self):
+        return [self.item_name, self.item_price, self.item_quantity]
+
 class Transaction:
+    __slots__ = ("account_name", "transaction_type", "amount")
+
     def __init__(self, account_name, transaction_type, amount):
         self.account_name = account_name
-        self.transaction_type = transaction_type
+        self.transaction_type = sys.intern(transaction_type)
         self.amount = amount
 
 class Tax:
+    __slots__ = ("rate",)
+
     def __init__(self, rate):
         self.rate = rate
 
     def calculate_tax(self, amount):
         return (self.rate / 100) * amount
 
+    # Tax on a batch of lines: rates per line (GST slabs) default to this rate.
+    # Returns tax per line in rupees, like calculate_tax, rounded to the paisa
+    # and a gst.GstSummary with slab/HSN totals (kept in paise).
+    def calculate_batch(self, amounts, rates=None, hsn_codes=None):
+        from gst import compute_gst  # Needs numpy
+        tax_paise, summary = compute_gst(amounts, self.rate if rates is None else rates, hsn_codes)
+        return tax_paise / SCALE, summary
+
 class LedgerMaster:
-    def __init__(self, file_name="ledger_data.json"):
+    def __init__(self, file_name="ledger_data.json", journal=False, compact_every=1000,
+                 write_behind=False, flush_interval_ms=200, flush_every=1000):
         self.accounts = {}
         self.inventory = {}
         self.transactions = []
         self.tax_rate = Tax(18)  # Default tax rate of 18%
+        # Secondary indexes, rebuilt after loading and kept in step by the mutators
+        self.account_index = AccountIndex()
+        self.item_index = NameIndex()
         self.file_name = file_name
+        # Journal mode appends one record per mutation and compacts periodically
+        self.journal = journal
+        self.journal_name = file_name + ".journal"
+        self.compact_every = compact_every
+        self.journal_entries = 0
+        self.journal_file = None
+        # Write-behind mode marks the ledger dirty and a background thread
+        # saves at most every flush_interval_ms or every flush_every mutations
+        self.write_behind = write_behind
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_every = flush_every
+        self.lock = threading.RLock()
+        self.dirty = False
+        self.pending = 0
+        self.flush_wanted = threading.Event()
+        self.flush_error = None  # Last background save failure, None once a save succeeds
+        self.closed = False
         self.load_data()
+        self.flusher = None
+        if write_behind:
+            self.flusher = threading.Thread(target=self.flush_loop, name="ledger-flusher", daemon=True)
+            self.flusher.start()
+            atexit.register(self.close)
 
+    @instrumentation.timed("ledger_master.load_data")
     def load_data(self):
         try:
-            with open(self.file_name, 'r') as file:
-                data = json.load(file)
+            data = ledger_codec.load_file(self.file_name)
+            if instrumentation.ENABLED:
+                instrumentation.add_bytes("ledger_master.load_data", bytes_read=os.path.getsize(self.file_name))
+            if data.get("format") == 2:
+                # Rows map straight onto constructor arguments, no per-record dicts
+                for row in data["accounts"]:
+                    self.accounts[row[0]] = LedgerAccount(*row)
+                for row in data["inventory"]:
+                    self.inventory[row[0]] = InventoryItem(*row)
+            else:
                 for account_data in data.get("accounts", []):
                     account = LedgerAccount(
                         account_data['account_name'], 
@@ -81,50 +152,213 @@ class LedgerMaster:
             print("Data loaded successfully.")
         except FileNotFoundError:
             print("No previous data found. Starting fresh.")
-        except json.JSONDecodeError:
+        except ledger_codec.DecodeError:
             print("Error loading data. Starting with fresh data.")
+        self.replay_journal()
+        self.rebuild_indexes()
+
+    # Bulk build: one sort per index instead of an insert per record
+    def rebuild_indexes(self):
+        self.account_index = AccountIndex((account.account_name, account.account_type, account.balance)
+                                          for account in self.accounts.values())
+        self.item_index = NameIndex(self.inventory)
+
+    # Apply journal records written after the last snapshot. A torn write at
+    # the tail (a partial or newline-less last line) is cut off so that new
+    # records are appended after the last intact one, not glued onto it.
+    def replay_journal(self):
+        if not os.path.exists(self.journal_name):
+            return
+        good_offset = 0
+        torn = False
+        with open(self.journal_name, 'rb') as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    torn = True
+                    break
+                try:
+                    entry = ledger_codec.loads(line)
+                except ledger_codec.DecodeError:
+                    torn = True  # Everything before the torn line is intact
+                    break
+                self.apply_journal_entry(entry)
+                self.journal_entries += 1
+                good_offset += len(line)
+        if torn:
+            with open(self.journal_name, 'r+b') as file:
+                file.truncate(good_offset)
+                file.flush()
+                os.fsync(file.fileno())
+            print(f"Discarded a torn journal record after entry {self.journal_entries}.")
+        print(f"Replayed {self.journal_entries} journal entries.")
+
+    def apply_journal_entry(self, entry):
+        op = entry["op"]
+        if op == "account":
+            self.accounts[entry["name"]] = LedgerAccount(entry["name"], entry["type"], entry["balance"])
+        elif op == "balance":
+            account = self.accounts.get(entry["name"])
+            if account:
+                account.balance = entry["balance"]
+        elif op == "item":
+            self.inventory[entry["name"]] = InventoryItem(entry["name"], entry["price"], entry["quantity"])
 
     def save_data(self):
-        data = {
-            "accounts": [account.to_dict() for account in self.accounts.values()],
-            "inventory": [item.to_dict() for item in self.inventory.values()],
-        }
-        with open(self.file_name, 'w') as file:
-            json.dump(data, file, indent=4)
+        with instrumentation.measure("ledger_master.save_data") as span:
+            span.bytes_written = self.write_snapshot()
         print("Data saved successfully.")
 
+    # Atomic, durable snapshot: write and fsync a temp file, then os.replace it
+    # over the old one, so a crash leaves either the old or the new file
+    def write_snapshot(self):
+        with self.lock:
+            data = {
+                "format": 2,
+                "account_fields": ACCOUNT_FIELDS,
+                "accounts": [account.to_row() for account in self.accounts.values()],
+                "inventory_fields": INVENTORY_FIELDS,
+                "inventory": [item.to_row() for item in self.inventory.values()],
+            }
+            temp_name = self.file_name + ".tmp"
+            payload = ledger_codec.dumps(data)
+            with open(temp_name, 'wb') as file:
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temp_name, self.file_name)
+            # The snapshot now holds everything the journal recorded
+            if self.journal_file:
+                self.journal_file.close()
+                self.journal_file = None
+            if os.path.exists(self.journal_name):
+                os.remove(self.journal_name)
+            self.journal_entries = 0
+            self.dirty = False
+            self.pending = 0
+            return len(payload)
+
+    # Persist one mutation: append to the journal in journal mode, mark dirty
+    # in write-behind mode, otherwise rewrite the snapshot
+    def record(self, entry):
+        if not self.journal:
+            if self.write_behind:
+                with self.lock:
+                    self.dirty = True
+                    self.pending += 1
+                    if self.pending >= self.flush_every:
+                        self.flush_wanted.set()
+                return
+            self.save_data()
+            return
+        if self.journal_file is None:
+            self.journal_file = open(self.journal_name, 'ab')
+        with instrumentation.measure("ledger_master.journal_append") as span:
+            line = ledger_codec.dumps(entry) + b"\n"
+            self.journal_file.write(line)
+            self.journal_file.flush()
+            span.bytes_written = len(line)
+        self.journal_entries += 1
+        if self.journal_entries >= self.compact_every:
+            self.compact()
+
+    # Fold the journal back into the snapshot file
+    def compact(self):
+        self.save_data()
+
+    # A failed write (disk full, EACCES) must not kill the thread: it is
+    # reported once, kept in flush_error, and retried on the next tick while
+    # the ledger stays dirty
+    def flush_loop(self):
+        while not self.closed:
+            self.flush_wanted.wait(self.flush_interval)
+            self.flush_wanted.clear()
+            try:
+                self.flush()
+            except Exception as error:
+                if self.flush_error is None:
+                    print(f"Background save failed, retrying: {error}", file=sys.stderr)
+                self.flush_error = error
+            else:
+                self.flush_error = None
+
+    # Write pending mutations now; returns once they are on disk
+    def flush(self):
+        with self.lock:
+            if self.dirty:
+                self.write_snapshot()
+
+    # Stop the background flusher and make everything durable
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self.flusher:
+            self.flush_wanted.set()
+            self.flusher.join()
+        self.flush()
+        if self.journal_file:
+            self.journal_file.close()
+            self.journal_file = None
+
     def create_account(self, name, account_type, initial_balance=0.0):
         if name in self.accounts:
             print(f"Account with name '{name}' already exists.")
             return
-        self.accounts[name] = LedgerAccount(name, account_type, initial_balance)
+        with self.lock:
+            account = self.accounts[name] = LedgerAccount(name, account_type, initial_balance)
+        self.account_index.add(name, account.account_type, initial_balance)
         print(f"Account '{name}' created successfully.")
-        self.save_data()
+        self.record({"op": "account", "name": name, "type": account_type, "balance": initial_balance})
 
     def view_account(self, name):
         account = self.accounts.get(name)
-        if account:
-            print(f"Account Name: {account.account_name}")
-            print(f"Account Type: {account.account_type}")
-            print(f"Balance: {account.balance}")
+        if account is None:
+            # Fall back to a prefix match: "hari" finds "haritesla"
+            matches = self.account_index.names.prefix(name, limit=10)
+            if len(matches) != 1:
+                print("Account not found." if not matches else f"Accounts starting with '{name}': {', '.join(matches)}")
+                return
+            account = self.accounts[matches[0]]
+        print(f"Account Name: {account.account_name}")
+        print(f"Account Type: {account.account_type}")
+        print(f"Balance: {account.balance}")
+
+    # Accounts whose names start with prefix, in name order, optionally of one type
+    def search_accounts(self, prefix, account_type=None, limit=None):
+        if account_type is None:
+            names = self.account_index.names.prefix(prefix, limit)
         else:
-            print("Account not found.")
+            names = self.account_index.types.names(account_type, prefix, limit)
+        return [self.accounts[name] for name in names]
+
+    # Accounts with the largest (or smallest) balances, from the balance index
+    def top_accounts(self, n, largest=True):
+        balances = self.account_index.balances
+        pairs = balances.top(n) if largest else balances.bottom(n)
+        return [self.accounts[name] for name, _ in pairs]
+
+    def search_inventory(self, prefix, limit=None):
+        return [self.inventory[name] for name in self.item_index.prefix(prefix, limit)]
 
     def credit_account(self, name, amount):
         account = self.accounts.get(name)
         if account:
+            old_balance = account.balance
             account.credit(amount)
+            self.account_index.update_balance(name, old_balance, account.balance)
             print(f"Credited {amount} to {name}")
-            self.save_data()
+            self.record({"op": "balance", "name": name, "balance": account.balance})
         else:
             print("Account not found.")
 
     def debit_account(self, name, amount):
         account = self.accounts.get(name)
         if account:
+            old_balance = account.balance
             account.debit(amount)
+            self.account_index.update_balance(name, old_balance, account.balance)
             print(f"Debited {amount} from {name}")
-            self.save_data()
+            self.record({"op": "balance", "name": name, "balance": account.balance})
         else:
             print("Account not found.")
 
@@ -132,9 +366,11 @@ class LedgerMaster:
         if name in self.inventory:
             print(f"Item '{name}' already exists.")
             return
-        self.inventory[name] = InventoryItem(name, price, quantity)
+        with self.lock:
+            self.inventory[name] = InventoryItem(name, price, quantity)
+        self.item_index.add(name)
         print(f"Inventory item '{name}' added successfully.")
-        self.save_data()
+        self.record({"op": "item", "name": name, "price": price, "quantity": quantity})
 
     def view_inventory(self):
         for item_name, item in self.inventory.items():
@@ -150,12 +386,20 @@ class LedgerMaster:
         print(f"Tax on sale of {sale_amount}: {tax}")
         return tax
 
+    # Month-end GST over a whole register instead of one apply_tax_on_sale per line
+    def apply_tax_on_sales(self, sale_amounts, rates=None, hsn_codes=None):
+        tax, summary = self.tax_rate.calculate_batch(sale_amounts, rates, hsn_codes)
+        for rate, lines, taxable, slab_tax in summary.slab_rows():
+            if lines:
+                print(f"GST {rate}%: {lines} lines, taxable {taxable:.2f}, tax {slab_tax:.2f}")
+        return tax, summary
+
     def display_all_accounts(self):
         for account_name, account in self.accounts.items():
             print(f"Account Name: {account.account_name}, Type: {account.account_type}, Balance: {account.balance}")
 
 def main():
-    ledger = LedgerMaster()
+    ledger = LedgerMaster(journal=True)
 
     while True:
         print("\nMenu:")
@@ -168,7 +412,9 @@ def main():
         print("7. Apply Tax on Purchase")
         print("8. Apply Tax on Sale")
         print("9. Display All Accounts")
-        print("10. Exit")
+        print("10. Financial Reports")
+        print("11. Search Accounts")
+        print("12. Exit")
 
         choice = input("Enter choice: ")
 
@@ -213,6 +459,23 @@ def main():
             ledger.display_all_accounts()
 
         elif choice == '10':
+            from reports import ReportEngine, print_reports  # Needs numpy and pandas
+            print_reports(ReportEngine.from_ledger_master(ledger))
+
+        elif choice == '11':
+            prefix = input("Enter name prefix (blank for all): ")
+            account_type = input("Enter account type (blank for any): ").strip() or None
+            for account in ledger.search_accounts(prefix, account_type, limit=50):
+                print(f"Account Name: {account.account_name}, Type: {account.account_type}, Balance: {account.balance}")
+            top = input("Show top N accounts by balance (blank to skip): ").strip()
+            if top.isdigit():
+                for account in ledger.top_accounts(int(top)):
+                    print(f"Account Name: {account.account_name}, Balance: {account.balance}")
+
+        elif choice == '12':
+            if ledger.journal:
+                ledger.compact()
+            ledger.close()
             print("Exiting...")
             break
 
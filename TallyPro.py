@@ -1,61 +1,455 @@
-import json
+import base64
+import csv
+import hashlib
+import math
 import os
+import sys
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+from datetime import date
 
+import instrumentation
+import ledger_codec
+import posting_log
+from ledger_index import BalanceIndex, NameIndex
+from money import to_paise
+
+TRANSACTION_TYPES = ("debit", "credit")
+TRANSACTION_TYPE_CODES = {name: code for code, name in enumerate(TRANSACTION_TYPES)}
+# Data file format 2 stores each ledger as a row in this column order; rows
+# written before postings were dated have only the first four columns
+LEDGER_FIELDS = ["name", "balance", "types", "amounts", "dates", "snapshots"]
+
+# Postings are dated by proleptic ordinal (date.toordinal()); 0 marks postings
+# recorded before dates were kept, which sort before every real date
+UNDATED = 0
+SNAPSHOT_PERIODS = ("day", "month")
+# Longest hex-encoded ledger name used as a file name; with ".json" it stays
+# under the common 255-byte NAME_MAX
+MAX_HEX_NAME = 240
+
+
+# Atomic, durable write: fsync a temp file, then os.replace it over the old one
+def write_file(path, payload):
+    with open(path + ".tmp", "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+def day_ordinal(day=None):
+    if day is None:
+        return date.today().toordinal()
+    if isinstance(day, str):
+        day = date.fromisoformat(day)
+    return day.toordinal()
+
+
+# Last day (as an ordinal) of the period holding `day`
+def period_end(day, period="month"):
+    if day <= UNDATED or period == "day":
+        return day
+    current = date.fromordinal(day)
+    if current.month == 12:
+        return date(current.year + 1, 1, 1).toordinal() - 1
+    return date(current.year, current.month + 1, 1).toordinal() - 1
+
+
+# Columns are stored as the little-endian array bytes, base64 encoded
+def encode_column(column):
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return base64.b64encode(column.tobytes()).decode("ascii")
+
+
+def decode_column(typecode, text):
+    column = array(typecode)
+    column.frombytes(base64.b64decode(text))
+    if sys.byteorder == "big" and column.itemsize > 1:
+        column.byteswap()
+    return column
+
+
+# Compact posting storage: a packed type-code array, a parallel float array and
+# a day-ordinal array (13 bytes per posting) instead of one dict per posting.
+# Iterating or indexing still yields {"type": ..., "amount": ..., "date": ...}
+# dicts, built on demand.
+class TransactionLog:
+    __slots__ = ("types", "amounts", "dates")
+
+    def __init__(self, transactions=None):
+        self.types = array('b')
+        self.amounts = array('d')
+        self.dates = array('i')
+        for transaction in transactions or []:
+            self.append(transaction)
+
+    def add(self, transaction_type, amount, day=UNDATED):
+        self.types.append(TRANSACTION_TYPE_CODES[transaction_type])
+        self.amounts.append(amount)
+        self.dates.append(day)
+
+    def append(self, transaction):
+        day = transaction.get("date")
+        self.add(transaction["type"], transaction["amount"], UNDATED if day is None else day_ordinal(day))
+
+    def __len__(self):
+        return len(self.amounts)
+
+    @staticmethod
+    def as_dict(code, amount, day):
+        return {"type": TRANSACTION_TYPES[code], "amount": amount,
+                "date": date.fromordinal(day).isoformat() if day != UNDATED else None}
+
+    def __getitem__(self, index):
+        return self.as_dict(self.types[index], self.amounts[index], self.dates[index])
+
+    def __iter__(self):
+        for code, amount, day in zip(self.types, self.amounts, self.dates):
+            yield self.as_dict(code, amount, day)
+
+    # Net effect of postings [start, end) dated on or before `day`
+    def net_through(self, day, start=0, end=None):
+        debit = TRANSACTION_TYPE_CODES["debit"]
+        net = 0.0
+        for code, amount, posted in zip(self.types[start:end], self.amounts[start:end], self.dates[start:end]):
+            if posted <= day:
+                net += -amount if code == debit else amount
+        return net
+
+    def to_dict(self):
+        return {
+            "types": encode_column(self.types),
+            "amounts": encode_column(self.amounts),
+            "dates": encode_column(self.dates),
+        }
+
+    # Accepts the columnar form (with or without dates) or the older list of dicts
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, list):
+            return cls(data)
+        log = cls()
+        log.types = decode_column('b', data["types"])
+        log.amounts = decode_column('d', data["amounts"])
+        if data.get("dates"):
+            log.dates = decode_column('i', data["dates"])
+        else:
+            log.dates = array('i', bytes(log.dates.itemsize * len(log.amounts)))
+        return log
+
+
+# Balance checkpoints for one ledger: after the postings [0, position) the
+# balance was `balance`, every one of those postings is dated on or before
+# `end`, and every later posting is dated after it. The first checkpoint
+# (end -1, position 0) holds the opening balance. `latest` is an upper bound
+# on every posting date, used to close the current period.
+class BalanceSnapshots:
+    __slots__ = ("ends", "positions", "balances", "latest")
+
+    def __init__(self):
+        self.ends = array('i')
+        self.positions = array('q')
+        self.balances = array('d')
+        self.latest = -1
+
+    def __len__(self):
+        return len(self.ends)
+
+    def add(self, end, position, balance):
+        self.ends.append(end)
+        self.positions.append(position)
+        self.balances.append(balance)
+
+    # Drop checkpoints that a posting dated `day` (appended at the end) would invalidate
+    def truncate_from(self, day):
+        keep = bisect_left(self.ends, day)
+        if keep < len(self.ends):
+            del self.ends[keep:], self.positions[keep:], self.balances[keep:]
+
+    # Call before the posting at `position`, dated `day`, is appended while the
+    # ledger balance is `balance`. A posting in a later period closes the
+    # current one with a checkpoint; a backdated posting drops the checkpoints
+    # it falls inside of.
+    def before_posting(self, day, position, balance, period="month"):
+        if day <= self.ends[-1]:
+            self.truncate_from(day)
+        elif position > self.positions[-1]:
+            closed = period_end(self.latest, period)
+            if day > closed:
+                self.add(closed, position, balance)
+        if day > self.latest:
+            self.latest = day
+
+    def to_dict(self):
+        return {
+            "ends": encode_column(self.ends),
+            "positions": encode_column(self.positions),
+            "balances": encode_column(self.balances),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        snapshots = cls()
+        snapshots.ends = decode_column('i', data["ends"])
+        snapshots.positions = decode_column('q', data["positions"])
+        snapshots.balances = decode_column('d', data["balances"])
+        return snapshots
+
+
+# Ledger and Voucher use __slots__ to drop the per-instance __dict__
 class Ledger:
-    def __init__(self, name, balance=0, transactions=None):
+    __slots__ = ("name", "balance", "transactions", "snapshots", "dirty")
+
+    def __init__(self, name, balance=0, transactions=None, snapshots=None):
         self.name = name
         self.balance = balance
-        self.transactions = transactions if transactions else []
+        if isinstance(transactions, TransactionLog):
+            self.transactions = transactions
+        else:
+            self.transactions = TransactionLog.from_dict(transactions or [])
+        if snapshots is None:
+            self.rebuild_snapshots()
+        else:
+            self.snapshots = snapshots
+            start = snapshots.positions[-1]
+            dates = self.transactions.dates
+            snapshots.latest = max(dates[start:]) if len(dates) > start else snapshots.ends[-1]
+        self.dirty = False  # Set when the ledger changes after it was loaded
 
-    def add_transaction(self, amount, transaction_type):
+    # Call before appending a posting dated `day`
+    def snapshot_before(self, day, period="month"):
+        self.snapshots.before_posting(day, len(self.transactions), self.balance, period)
+
+    # Recreate checkpoints by replaying every posting (ledgers saved without them)
+    def rebuild_snapshots(self, period="month"):
+        log = self.transactions
+        snapshots = self.snapshots = BalanceSnapshots()
+        balance = self.balance - log.net_through(sys.maxsize)
+        snapshots.add(-1, 0, balance)
+        debit = TRANSACTION_TYPE_CODES["debit"]
+        previous = None
+        for position, (code, amount, day) in enumerate(zip(log.types, log.amounts, log.dates)):
+            if day != previous:  # A repeat of the previous date can neither close nor reopen a period
+                snapshots.before_posting(day, position, balance, period)
+                previous = day
+            balance += -amount if code == debit else amount
+
+    def add_transaction(self, amount, transaction_type, day=None, period="month"):
+        day = day_ordinal(day) if not isinstance(day, int) else day
         if transaction_type.lower() == "debit":
+            self.snapshot_before(day, period)
             self.balance -= amount
-            self.transactions.append({"type": "debit", "amount": amount})
+            self.transactions.add("debit", amount, day)
+            self.dirty = True
         elif transaction_type.lower() == "credit":
+            self.snapshot_before(day, period)
             self.balance += amount
-            self.transactions.append({"type": "credit", "amount": amount})
+            self.transactions.add("credit", amount, day)
+            self.dirty = True
         else:
             print("Invalid transaction type. Use 'debit' or 'credit'.")
 
+    # Balance at the end of `day`: the latest checkpoint on or before it plus
+    # the postings up to the next checkpoint, never a scan from the beginning
+    def balance_as_of(self, day):
+        day = day_ordinal(day) if not isinstance(day, int) else day
+        snapshots = self.snapshots
+        k = bisect_right(snapshots.ends, day)
+        if k == 0:
+            return None  # Before the opening checkpoint
+        end = snapshots.positions[k] if k < len(snapshots) else None
+        return snapshots.balances[k - 1] + self.transactions.net_through(day, snapshots.positions[k - 1], end)
+
     def display_ledger(self):
         print(f"\nLedger: {self.name}")
         print(f"Balance: {self.balance}")
         print("Transactions:")
         for transaction in self.transactions:
-            print(f"  - {transaction['type'].capitalize()} of {transaction['amount']}")
+            dated = f" on {transaction['date']}" if transaction['date'] else ""
+            print(f"  - {transaction['type'].capitalize()} of {transaction['amount']}{dated}")
         print("\n")
 
     def to_dict(self):
         return {
             "name": self.name,
             "balance": self.balance,
-            "transactions": self.transactions
+            "transactions": self.transactions.to_dict(),
+            "snapshots": self.snapshots.to_dict(),
         }
 
     @classmethod
     def from_dict(cls, data):
-        return cls(data["name"], data["balance"], data["transactions"])
+        snapshots = data.get("snapshots")
+        return cls(data["name"], data["balance"], data["transactions"],
+                   BalanceSnapshots.from_dict(snapshots) if snapshots else None)
+
+    def to_row(self):
+        columns = self.transactions.to_dict()
+        return [self.name, self.balance, columns["types"], columns["amounts"], columns["dates"],
+                self.snapshots.to_dict()]
+
+    @classmethod
+    def from_row(cls, row):
+        name, balance, types, amounts = row[:4]
+        dates = row[4] if len(row) > 4 else None
+        snapshots = BalanceSnapshots.from_dict(row[5]) if len(row) > 5 else None
+        log = TransactionLog.from_dict({"types": types, "amounts": amounts, "dates": dates})
+        return cls(name, balance, log, snapshots)
+
+
+# One JSON file per ledger in a directory. A ledger is read the first time it is
+# accessed and only ledgers marked dirty are written back by flush(), so opening
+# the store costs the same however many ledgers and postings it holds.
+class LedgerStore(MutableMapping):
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.loaded = {}
+
+    # Hex of the UTF-8 name: reversible and safe on case-insensitive file systems.
+    # Names too long for a file name use "h" + SHA-256 instead (never valid hex);
+    # __iter__ reads their name back from the file.
+    def path_for(self, name):
+        encoded = name.encode("utf-8").hex()
+        if len(encoded) > MAX_HEX_NAME:
+            encoded = "h" + hashlib.sha256(name.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, encoded + ".json")
+
+    # Ledger names are strings; any other key is simply missing
+    def __contains__(self, name):
+        return isinstance(name, str) and (name in self.loaded or os.path.exists(self.path_for(name)))
+
+    def __getitem__(self, name):
+        if not isinstance(name, str):
+            raise KeyError(name)
+        ledger = self.loaded.get(name)
+        if ledger is None:
+            try:
+                ledger = Ledger.from_dict(ledger_codec.load_file(self.path_for(name)))
+            except FileNotFoundError:
+                raise KeyError(name) from None
+            self.loaded[name] = ledger
+        return ledger
+
+    def __setitem__(self, name, ledger):
+        ledger.dirty = True
+        self.loaded[name] = ledger
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self.loaded.pop(name, None)
+        if os.path.exists(self.path_for(name)):
+            os.remove(self.path_for(name))
+
+    def __iter__(self):
+        seen = set(self.loaded)
+        yield from self.loaded
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                if entry.name.startswith("h"):
+                    name = ledger_codec.load_file(entry.path)["name"]
+                else:
+                    name = bytes.fromhex(entry.name[:-len(".json")]).decode("utf-8")
+                if name not in seen:
+                    yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    # Write modified ledgers (fsynced temp file + rename each) and return how many were written
+    def flush(self):
+        written = 0
+        for name, ledger in self.loaded.items():
+            if ledger.dirty:
+                payload = ledger_codec.dumps(ledger.to_dict())
+                write_file(self.path_for(name), payload)
+                instrumentation.add_bytes("tally.save_data", bytes_written=len(payload))
+                ledger.dirty = False
+                written += 1
+        return written
 
 
 class Voucher:
-    def __init__(self, voucher_type, amount, from_ledger, to_ledger):
-        self.voucher_type = voucher_type
+    __slots__ = ("voucher_type", "amount", "from_ledger", "to_ledger", "date")
+
+    def __init__(self, voucher_type, amount, from_ledger, to_ledger, day=None):
+        self.voucher_type = sys.intern(voucher_type)
         self.amount = amount
         self.from_ledger = from_ledger
         self.to_ledger = to_ledger
+        self.date = day_ordinal(day)
 
-    def process_voucher(self):
+    def process_voucher(self, period="month"):
         print(f"Processing {self.voucher_type} voucher for amount {self.amount}")
-        self.from_ledger.add_transaction(self.amount, "debit")
-        self.to_ledger.add_transaction(self.amount, "credit")
+        self.from_ledger.add_transaction(self.amount, "debit", self.date, period)
+        self.to_ledger.add_transaction(self.amount, "credit", self.date, period)
         print(f"{self.voucher_type} voucher processed successfully.\n")
 
 
 class TallyPrimeSystem:
-    def __init__(self, filename="tally_data.json"):
+    def __init__(self, filename="tally_data.json", ledger_dir=None, snapshot_period="month", posting_log_path=None):
+        if snapshot_period not in SNAPSHOT_PERIODS:
+            raise ValueError(f"snapshot_period must be one of {SNAPSHOT_PERIODS}")
         self.ledgers = {}
         self.filename = filename
+        self.snapshot_period = snapshot_period  # Balance checkpoints are taken per day or per month
+        self.ledger_dir = ledger_dir  # When set, ledgers live one per file and load lazily
+        # Both indexes are built on first use: listing a ledger directory
+        # costs O(#ledgers), which startup must not pay
+        self.name_index = None
+        # Built on the first balance query (it has to read every ledger), then
+        # maintained per voucher; bulk imports drop it to be rebuilt once
+        self.balance_index = None
+        # Optional binary posting log (posting_log.py) that every posting is appended to
+        self.posting_log = None
         self.load_data()
+        if posting_log_path:
+            self.open_posting_log(posting_log_path)
+
+    def open_posting_log(self, path):
+        self.posting_log = posting_log.PostingLogWriter(path)
+
+    # Opening records are written lazily: just before a ledger's first posting
+    # in the log, its balance so far goes in, dated at the epoch so it
+    # precedes every posting. Opening a log reads no ledgers, and a rebuild
+    # leaves ledgers the log has never seen at their stored balance.
+    def seed_posting_log(self, names):
+        known = self.posting_log.ledgers
+        missing = [name for name in dict.fromkeys(names) if name not in known]
+        if missing:
+            self.posting_log.append_many((name, to_paise(self.ledgers[name].balance), "Opening", 0)
+                                         for name in missing)
+
+    # Call before the voucher is applied, so the ledgers' opening balances are right
+    def log_voucher(self, voucher_type, amount, from_ledger_name, to_ledger_name, day):
+        self.seed_posting_log((from_ledger_name, to_ledger_name))
+        paise = to_paise(amount)
+        timestamp = posting_log.day_to_micros(day)
+        self.posting_log.append_many([(from_ledger_name, -paise, voucher_type, timestamp),
+                                      (to_ledger_name, paise, voucher_type, timestamp)])
+
+    # Replace every ledger balance with the sum of its postings in the log
+    def rebuild_balances_from_log(self):
+        if self.posting_log is None:
+            print("No posting log is configured.")
+            return 0
+        self.posting_log.flush()
+        updated = posting_log.rebuild_balances(self.ledgers, self.posting_log.path)
+        self.invalidate_balance_index()
+        self.save_data()
+        print(f"Rebuilt {updated} ledger balance(s) from {self.posting_log.path}.")
+        return updated
+
+    def close(self):
+        if self.posting_log is not None:
+            self.posting_log.close()
+            self.posting_log = None
 
     def create_ledger(self, ledger_name):
         if ledger_name in self.ledgers:
@@ -63,15 +457,51 @@ class TallyPrimeSystem:
         else:
             ledger = Ledger(ledger_name)
             self.ledgers[ledger_name] = ledger
+            if self.name_index is not None:
+                self.name_index.add(ledger_name)
+            if self.balance_index is not None:
+                self.balance_index.add(ledger_name, ledger.balance)
             self.save_data()
             print(f"Ledger '{ledger_name}' created successfully.")
 
     def display_ledger(self, ledger_name):
         if ledger_name in self.ledgers:
             self.ledgers[ledger_name].display_ledger()
+            return
+        # Fall back to a prefix match: "hari" finds "haritesla"
+        matches = self.name_order().prefix(ledger_name, limit=10)
+        if len(matches) == 1:
+            self.ledgers[matches[0]].display_ledger()
+        elif matches:
+            print(f"Ledgers starting with '{ledger_name}': {', '.join(matches)}")
         else:
             print(f"No ledger found with name '{ledger_name}'.")
 
+    # Ledger names starting with prefix, in name order
+    def search_ledgers(self, prefix, limit=None):
+        return self.name_order().prefix(prefix, limit)
+
+    def name_order(self):
+        if self.name_index is None:
+            # iter(): sorted() would call LedgerStore.__len__, a second directory scan
+            self.name_index = NameIndex(iter(self.ledgers))
+        return self.name_index
+
+    def balance_order(self):
+        if self.balance_index is None:
+            self.balance_index = BalanceIndex((name, self.ledgers[name].balance) for name in self.name_order().names)
+        return self.balance_index
+
+    # [(name, balance)] for the ledgers with the largest (or smallest) balances
+    def top_ledgers(self, n, largest=True):
+        balances = self.balance_order()
+        return balances.top(n) if largest else balances.bottom(n)
+
+    # Bulk balance changes (imports, the sharded posting engine) call this
+    # instead of updating the balance index per posting
+    def invalidate_balance_index(self):
+        self.balance_index = None
+
     def display_all_ledgers(self):
         if self.ledgers:
             print("\nDisplaying all ledgers:")
@@ -80,42 +510,165 @@ class TallyPrimeSystem:
         else:
             print("No ledgers available.")
 
-    def create_voucher(self, voucher_type, amount, from_ledger_name, to_ledger_name):
+    # Balance of a ledger at the end of `day` (a date or ISO string)
+    def balance_as_of(self, ledger_name, day):
+        if ledger_name not in self.ledgers:
+            print(f"No ledger found with name '{ledger_name}'.")
+            return None
+        return self.ledgers[ledger_name].balance_as_of(day)
+
+    @instrumentation.timed("tally.create_voucher")
+    def create_voucher(self, voucher_type, amount, from_ledger_name, to_ledger_name, day=None):
         if from_ledger_name not in self.ledgers or to_ledger_name not in self.ledgers:
             print("Both ledgers must exist to create a voucher.")
             return
 
         from_ledger = self.ledgers[from_ledger_name]
         to_ledger = self.ledgers[to_ledger_name]
-        voucher = Voucher(voucher_type, amount, from_ledger, to_ledger)
-        voucher.process_voucher()
+        old_balances = from_ledger.balance, to_ledger.balance
+        voucher = Voucher(voucher_type, amount, from_ledger, to_ledger, day)
+        if self.posting_log is not None:
+            self.log_voucher(voucher_type, amount, from_ledger_name, to_ledger_name, voucher.date)
+        voucher.process_voucher(self.snapshot_period)
+        if self.balance_index is not None:
+            self.balance_index.update(from_ledger_name, old_balances[0], from_ledger.balance)
+            if to_ledger is not from_ledger:
+                self.balance_index.update(to_ledger_name, old_balances[1], to_ledger.balance)
         self.save_data()  # Save after each voucher entry
 
+    # Bulk import from a CSV (header: voucher_type,amount,from_ledger,to_ledger
+    # and an optional ISO date, default today) or a JSONL file with the same
+    # keys. Vouchers are posted without per-voucher
+    # output and saved once at the end, or every `checkpoint` vouchers.
+    @instrumentation.timed("tally.import_vouchers")
+    def import_vouchers(self, path, checkpoint=None):
+        start = time.perf_counter()
+        imported = 0
+        rejected = []
+        self.invalidate_balance_index()
+        for line_number, row in self.read_voucher_rows(path):
+            if row is None:
+                rejected.append((line_number, "invalid JSON"))
+                continue
+            if not isinstance(row, dict):
+                rejected.append((line_number, "invalid row (not an object)"))
+                continue
+            try:
+                amount = float(row["amount"])
+                day = day_ordinal(row.get("date") or None)
+                from_name, to_name = row["from_ledger"], row["to_ledger"]
+            except (KeyError, TypeError, ValueError) as error:
+                rejected.append((line_number, f"invalid row ({error!r})"))
+                continue
+            # Short CSV rows give None and JSONL rows may give numbers
+            if not isinstance(from_name, str) or not isinstance(to_name, str):
+                rejected.append((line_number, "invalid ledger name"))
+                continue
+            from_ledger = self.ledgers.get(from_name)
+            to_ledger = self.ledgers.get(to_name)
+            if from_ledger is None or to_ledger is None:
+                rejected.append((line_number, "unknown ledger"))
+                continue
+            if not math.isfinite(amount) or amount <= 0:
+                rejected.append((line_number, f"invalid amount ({row['amount']!r})"))
+                continue
+            if self.posting_log is not None:
+                self.log_voucher(row.get("voucher_type") or "Import", amount, from_name, to_name, day)
+            from_ledger.add_transaction(amount, "debit", day, self.snapshot_period)
+            to_ledger.add_transaction(amount, "credit", day, self.snapshot_period)
+            imported += 1
+            if checkpoint and imported % checkpoint == 0:
+                self.save_data()
+        self.save_data()
+
+        elapsed = time.perf_counter() - start
+        rate = imported / elapsed if elapsed else 0
+        print(f"Imported {imported} vouchers in {elapsed:.2f} s ({rate:,.0f} vouchers/sec), "
+              f"rejected {len(rejected)}.")
+        for line_number, reason in rejected[:10]:
+            print(f"  - Line {line_number}: {reason}")
+        if len(rejected) > 10:
+            print(f"  ... and {len(rejected) - 10} more")
+        return imported, rejected
+
+    # Yields (line number, row dict); unparseable JSONL lines yield None as the row
+    @staticmethod
+    def read_voucher_rows(path):
+        with open(path, "r", newline="") as f:
+            if path.endswith(".jsonl"):
+                for line_number, line in enumerate(f, start=1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield line_number, ledger_codec.loads(line)
+                    except ledger_codec.DecodeError:
+                        yield line_number, None
+            else:
+                for line_number, row in enumerate(csv.DictReader(f), start=2):
+                    yield line_number, row
+
+    @instrumentation.timed("tally.save_data")
     def save_data(self):
-        data = {name: ledger.to_dict() for name, ledger in self.ledgers.items()}
-        with open(self.filename, "w") as f:
-            json.dump(data, f)
+        if self.posting_log is not None:
+            self.posting_log.flush()
+        if isinstance(self.ledgers, LedgerStore):
+            written = self.ledgers.flush()
+            print(f"Saved {written} modified ledger(s).")
+            return
+        data = {
+            "format": 2,
+            "ledger_fields": LEDGER_FIELDS,
+            "ledgers": [ledger.to_row() for ledger in self.ledgers.values()],
+        }
+        payload = ledger_codec.dumps(data)
+        write_file(self.filename, payload)
+        instrumentation.add_bytes("tally.save_data", bytes_written=len(payload))
         print("Data saved to JSON file.")
 
+    # Yields ledgers from the data file: format 2 rows, or the older name -> dict layout
+    def read_data_file(self):
+        data = ledger_codec.load_file(self.filename)
+        if data.get("format") == 2:
+            for row in data["ledgers"]:
+                yield Ledger.from_row(row)
+        else:
+            for ledger_data in data.values():
+                yield Ledger.from_dict(ledger_data)
+
+    @instrumentation.timed("tally.load_data")
     def load_data(self):
+        if self.ledger_dir:
+            migrate = not os.path.isdir(self.ledger_dir) and os.path.exists(self.filename)
+            self.ledgers = LedgerStore(self.ledger_dir)
+            if migrate:
+                # First run with a ledger directory: split the single JSON file once
+                for ledger in self.read_data_file():
+                    self.ledgers[ledger.name] = ledger
+                self.ledgers.flush()
+                print(f"Migrated {self.filename} into {self.ledger_dir}.")
+            return
         if os.path.exists(self.filename):
-            with open(self.filename, "r") as f:
-                data = json.load(f)
-                self.ledgers = {name: Ledger.from_dict(ledger_data) for name, ledger_data in data.items()}
+            self.ledgers = {ledger.name: ledger for ledger in self.read_data_file()}
+            if instrumentation.ENABLED:
+                instrumentation.add_bytes("tally.load_data", bytes_read=os.path.getsize(self.filename))
             print("Data loaded from JSON file.")
         else:
             print("No existing data file found. Starting with an empty system.")
 
 
 def main():
-    tally_system = TallyPrimeSystem()
+    tally_system = TallyPrimeSystem(ledger_dir="tally_ledgers", posting_log_path="tally_postings.log")
     while True:
         print("\n=== Tally Prime Console Application ===")
         print("1. Create Ledger")
         print("2. Display Ledger")
         print("3. Display All Ledgers")
         print("4. Create Voucher")
-        print("5. Exit")
+        print("5. Import Vouchers from CSV/JSONL")
+        print("6. Search Ledgers")
+        print("7. Balance as of Date")
+        print("8. Rebuild Balances from Posting Log")
+        print("9. Exit")
         choice = input("Enter your choice: ")
 
         if choice == "1":
@@ -141,6 +694,38 @@ def main():
             tally_system.create_voucher(voucher_type, amount, from_ledger_name, to_ledger_name)
 
         elif choice == "5":
+            path = input("Enter path to the voucher file: ")
+            checkpoint = input("Save every N vouchers (blank to save once at the end): ").strip()
+            try:
+                tally_system.import_vouchers(path, int(checkpoint) if checkpoint else None)
+            except (OSError, ValueError) as error:
+                print(f"Import failed: {error}")
+
+        elif choice == "6":
+            prefix = input("Enter name prefix (blank for all): ")
+            for name in tally_system.search_ledgers(prefix, limit=50):
+                print(f"  - {name}")
+            top = input("Show top N ledgers by balance (blank to skip): ").strip()
+            if top.isdigit():
+                for name, balance in tally_system.top_ledgers(int(top)):
+                    print(f"  - {name}: {balance}")
+
+        elif choice == "7":
+            ledger_name = input("Enter ledger name: ")
+            try:
+                day = date.fromisoformat(input("Enter date (YYYY-MM-DD): ").strip())
+            except ValueError:
+                print("Invalid date. Please use YYYY-MM-DD.")
+                continue
+            balance = tally_system.balance_as_of(ledger_name, day)
+            if balance is not None:
+                print(f"Balance of '{ledger_name}' on {day.isoformat()}: {balance}")
+
+        elif choice == "8":
+            tally_system.rebuild_balances_from_log()
+
+        elif choice == "9":
+            tally_system.close()
             print("Exiting the application.")
             break
 
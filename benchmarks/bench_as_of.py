@@ -0,0 +1,103 @@
+# Point-in-time balances: snapshot lookup + partial replay vs a scan from the
+# first posting, for a TallyPro ledger and for the Consoleapp postings table
+# Run from the repository root: python -m benchmarks.bench_as_of --postings 10000000
+import argparse
+import os
+import random
+import tempfile
+import time
+from array import array
+from datetime import date, timedelta
+
+from Consoleapp import Account, Database
+from TallyPro import Ledger, TransactionLog
+
+START = date(2020, 1, 1)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+# One ledger with `count` postings spread evenly, in date order, over `days` days
+def make_log(count, days, rng):
+    log = TransactionLog()
+    first = START.toordinal()
+    log.types = array('b', (rng.getrandbits(1) for _ in range(count)))
+    log.amounts = array('d', (rng.randrange(1, 100_000) / 100 for _ in range(count)))
+    log.dates = array('i', (first + i * days // count for i in range(count)))
+    return log
+
+
+def bench_tally(count, days, queries, scan_queries, rng):
+    log, build = timed(lambda: make_log(count, days, rng))
+    ledger, rebuild = timed(lambda: Ledger("bench", log.net_through(10 ** 9), log))
+    opening = ledger.snapshots.balances[0]
+    as_of = [START + timedelta(days=rng.randrange(days)) for _ in range(queries)]
+
+    _, snapshot = timed(lambda: [ledger.balance_as_of(day) for day in as_of])
+    _, scan = timed(lambda: [opening + log.net_through(day.toordinal()) for day in as_of[:scan_queries]])
+    print(f"TallyPro: {count:,} postings over {days} days, built in {build:.1f} s, "
+          f"{len(ledger.snapshots)} monthly checkpoints rebuilt in {rebuild:.1f} s")
+    print(f"  snapshot + replay {snapshot / queries * 1e3:10.2f} ms/query")
+    print(f"  scan from start   {scan / scan_queries * 1e3:10.2f} ms/query")
+
+
+def bench_sqlite(count, days, queries, scan_queries, accounts, rng):
+    path = os.path.join(tempfile.mkdtemp(), "as_of.db")
+    db = Database(path, verbose=False)
+    account = Account(db)
+    names = [f"acct{i}" for i in range(accounts)]
+    with db.transaction():
+        for name in names:
+            account.create_account(name, "Asset", 0)
+    rows = []
+    for i in range(count):
+        day = (START + timedelta(days=i * days // count)).isoformat()
+        amount = rng.randrange(1, 100_000)
+        rows.append((f"V{i}", rng.choice(names), rng.choice(names), amount / 100, amount, day))
+    _, load = timed(lambda: db.executemany(
+        "INSERT INTO postings (voucher_number, debit_account, credit_account, amount, amount_paise, date) "
+        "VALUES (?, ?, ?, ?, ?, ?);", rows))
+    db.commit()
+    del rows
+
+    month_ends = []
+    month = date(START.year, START.month, 1)
+    while month < START + timedelta(days=days):
+        month = (month + timedelta(days=32)).replace(day=1)
+        month_ends.append((month - timedelta(days=1)).isoformat())
+    _, snapshot_time = timed(lambda: [account.snapshot_balances(end) for end in month_ends])
+
+    as_of = [((START + timedelta(days=rng.randrange(days))).isoformat(), rng.choice(names)) for _ in range(queries)]
+    _, snapshot = timed(lambda: [account.balance_as_of(name, day) for day, name in as_of])
+    db.execute("DELETE FROM balance_snapshots;")
+    db.commit()
+    _, scan = timed(lambda: [account.balance_as_of(name, day) for day, name in as_of[:scan_queries]])
+    db.close()
+    print(f"SQLite: {count:,} postings across {accounts} accounts, loaded in {load:.1f} s, "
+          f"{len(month_ends)} month-end snapshots in {snapshot_time:.1f} s")
+    print(f"  snapshot + replay {snapshot / queries * 1e3:10.2f} ms/query")
+    print(f"  scan from start   {scan / scan_queries * 1e3:10.2f} ms/query")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="As-of balance query benchmark")
+    parser.add_argument("--postings", type=int, default=10_000_000)
+    parser.add_argument("--db-postings", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--scan-queries", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    bench_tally(args.postings, args.days, args.queries, args.scan_queries, rng)
+    bench_sqlite(args.db_postings, args.days, args.queries, args.scan_queries, args.accounts, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Encode/decode cost of ledger snapshots: stdlib json with dict records (the old
+# ledger_data.json layout) vs ledger_codec with schema rows
+# Run from the repository root: python -m benchmarks.bench_codec --records 10000 100000 1000000
+import argparse
+import json
+import time
+
+import ledger_codec
+from LedgerMaster import ACCOUNT_FIELDS, LedgerAccount
+
+ACCOUNT_TYPES = ["Asset", "Liability", "Income", "Expense"]
+
+
+def make_accounts(count):
+    return [LedgerAccount(f"acct{i}", ACCOUNT_TYPES[i % 4], float(i % 100_000)) for i in range(count)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def bench_stdlib_dicts(accounts):
+    encoded, encode = timed(lambda: json.dumps({"accounts": [a.to_dict() for a in accounts]}, indent=4))
+    _, decode = timed(lambda: [LedgerAccount(d["account_name"], d["account_type"], d["balance"])
+                               for d in json.loads(encoded)["accounts"]])
+    return len(encoded), encode, decode
+
+
+def bench_codec_rows(accounts):
+    encoded, encode = timed(lambda: ledger_codec.dumps(
+        {"format": 2, "account_fields": ACCOUNT_FIELDS, "accounts": [a.to_row() for a in accounts]}))
+    _, decode = timed(lambda: [LedgerAccount(*row) for row in ledger_codec.loads(encoded)["accounts"]])
+    return len(encoded), encode, decode
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ledger snapshot codec benchmark")
+    parser.add_argument("--records", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"codec: {ledger_codec.CODEC}")
+    for count in args.records:
+        accounts = make_accounts(count)
+        for name, bench in [("json indent=4 dicts", bench_stdlib_dicts),
+                            (f"{ledger_codec.CODEC} rows", bench_codec_rows)]:
+            size, encode, decode = bench(accounts)
+            print(f"{count:>9} {name:<20} {size / 1e6:8.1f} MB  encode {encode * 1e3:8.1f} ms  "
+                  f"decode+build {decode * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Compare per-row commits with the batched create_many path in Consoleapp.py
+# Run from the repository root: python -m benchmarks.bench_db_writes --rows 20000
+import argparse
+import os
+import tempfile
+import time
+
+from Consoleapp import Database, DBEntity
+
+FIELDS = ["voucher_number", "voucher_type", "amount", "date"]
+
+
+def make_rows(count, prefix):
+    return [[f"{prefix}{i}", "Sales", float(i % 1000), "2024-04-01"] for i in range(count)]
+
+
+def bench_per_row(db_path, rows):
+    entity = DBEntity(Database(db_path))
+    start = time.perf_counter()
+    for row in rows:
+        entity.create("vouchers", FIELDS, row)
+    elapsed = time.perf_counter() - start
+    entity.db.close()
+    return elapsed
+
+
+def bench_create_many(db_path, rows):
+    entity = DBEntity(Database(db_path))
+    start = time.perf_counter()
+    entity.create_many("vouchers", FIELDS, rows)
+    elapsed = time.perf_counter() - start
+    entity.db.close()
+    return elapsed
+
+
+def bench_transaction(db_path, rows):
+    entity = DBEntity(Database(db_path))
+    start = time.perf_counter()
+    with entity.db.transaction():
+        for row in rows:
+            entity.create("vouchers", FIELDS, row)
+    elapsed = time.perf_counter() - start
+    entity.db.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-row vs batched SQLite writes")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--per-row-rows", type=int, default=2000,
+                        help="rows for the slow per-row path (it commits every row)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = [
+            ("per-row commit", args.per_row_rows,
+             bench_per_row(os.path.join(tmp, "per_row.db"), make_rows(args.per_row_rows, "P"))),
+            ("transaction()", args.rows,
+             bench_transaction(os.path.join(tmp, "txn.db"), make_rows(args.rows, "T"))),
+            ("create_many", args.rows,
+             bench_create_many(os.path.join(tmp, "many.db"), make_rows(args.rows, "M"))),
+        ]
+
+    for name, count, elapsed in results:
+        print(f"{name:<16} {count:>9} rows  {elapsed:8.3f} s  {count / elapsed:12.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Month-end GST over a synthetic sales register: one Tax.calculate_tax call per
+# line against the vectorized batch in gst.py
+# Run from the repository root: python -m benchmarks.bench_gst --lines 10000000
+import argparse
+import time
+
+import numpy as np
+
+from gst import GST_SLABS
+from LedgerMaster import Tax
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch GST benchmark")
+    parser.add_argument("--lines", type=int, default=5_000_000)
+    parser.add_argument("--loop-lines", type=int, default=200_000,
+                        help="lines for the per-line loop, which is too slow for the full register")
+    parser.add_argument("--hsn-codes", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    amounts = rng.integers(1, 10_000_000, args.lines) / 100
+    rates = np.array(GST_SLABS)[rng.integers(0, len(GST_SLABS), args.lines)]
+    hsn_codes = rng.integers(1000, 1000 + args.hsn_codes, args.lines)
+    tax = Tax(18)
+
+    loop_amounts, loop_rates = amounts[:args.loop_lines].tolist(), rates[:args.loop_lines].tolist()
+    start = time.perf_counter()
+    for amount, rate in zip(loop_amounts, loop_rates):
+        Tax(rate).calculate_tax(amount)
+    loop = time.perf_counter() - start
+
+    start = time.perf_counter()
+    tax.calculate_batch(amounts, rates)
+    batch = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, summary = tax.calculate_batch(amounts, rates, hsn_codes)
+    batch_hsn = time.perf_counter() - start
+
+    print(f"per-line loop  {args.loop_lines / loop:>14,.0f} lines/sec")
+    print(f"batch          {args.lines / batch:>14,.0f} lines/sec")
+    print(f"batch + HSN    {args.lines / batch_hsn:>14,.0f} lines/sec ({len(summary.hsn)} HSN codes)")
+    for rate, lines, taxable, slab_tax in summary.slab_rows():
+        print(f"GST {rate:>2}%  {lines:>10} lines  taxable {taxable:>18,.2f}  tax {slab_tax:>16,.2f}")
+
+
+if __name__ == "__main__":
+    main()
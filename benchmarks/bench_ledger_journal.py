@@ -0,0 +1,46 @@
+# Per-posting latency of LedgerMaster with full rewrites vs the append-only journal
+# Run from the repository root: python -m benchmarks.bench_ledger_journal --accounts 1000 10000
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from LedgerMaster import LedgerAccount, LedgerMaster
+
+
+def bench(accounts, postings, journal):
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        file_name = os.path.join(tmp, "ledger_data.json")
+        ledger = LedgerMaster(file_name, journal=journal, compact_every=10 ** 9)
+        for i in range(accounts):
+            ledger.accounts[f"acct{i}"] = LedgerAccount(f"acct{i}", "Asset", 100.0)
+        ledger.save_data()
+
+        start = time.perf_counter()
+        for i in range(postings):
+            ledger.credit_account(f"acct{i % accounts}", 1.0)
+        posting = (time.perf_counter() - start) / postings
+
+        start = time.perf_counter()
+        LedgerMaster(file_name, journal=journal)
+        startup = time.perf_counter() - start
+    return posting, startup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LedgerMaster posting latency vs ledger size")
+    parser.add_argument("--accounts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--postings", type=int, default=200)
+    args = parser.parse_args()
+
+    for accounts in args.accounts:
+        for journal in (False, True):
+            posting, startup = bench(accounts, args.postings, journal)
+            mode = "journal" if journal else "rewrite"
+            print(f"{accounts:>8} accounts  {mode:<8} {posting * 1e6:10.1f} us/posting  startup {startup * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# Summing and taxing amounts as float, Decimal and int64 paise (money.py).
+# Float totals drift from the exact paise total as row counts grow.
+# Run from the repository root: python -m benchmarks.bench_money --rows 100000 1000000
+import argparse
+import random
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+import money
+
+GST_RATE = 18  # percent
+CENT = Decimal("0.01")
+
+
+def make_amounts(count, seed=42):
+    rng = random.Random(seed)
+    return [rng.randrange(1, 10_000_000) / 100 for _ in range(count)]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def bench_float(amounts):
+    total, sum_time = timed(lambda: sum(amounts))
+    tax, tax_time = timed(lambda: sum(round(amount * GST_RATE / 100, 2) for amount in amounts))
+    return money.to_paise(total), money.to_paise(tax), sum_time, tax_time
+
+
+def bench_decimal(amounts):
+    decimals = [Decimal(repr(amount)) for amount in amounts]
+    rate = Decimal(GST_RATE) / 100
+    total, sum_time = timed(lambda: sum(decimals))
+    tax, tax_time = timed(lambda: sum((amount * rate).quantize(CENT, rounding=ROUND_HALF_UP)
+                                      for amount in decimals))
+    return money.to_paise(total), money.to_paise(tax), sum_time, tax_time
+
+
+def bench_paise(amounts):
+    column = money.paise_column(amounts)
+    rate_bp = money.rate_to_basis_points(GST_RATE)
+    total, sum_time = timed(lambda: money.sum_paise(column))
+    tax, tax_time = timed(lambda: money.sum_paise(money.tax_paise(column, rate_bp)))
+    return total, tax, sum_time, tax_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Money representation benchmark")
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    backend = "numpy int64" if money.np is not None else "array('q')"
+    for count in args.rows:
+        amounts = make_amounts(count)
+        exact_total, exact_tax = None, None
+        for name, bench in [(f"paise {backend}", bench_paise), ("decimal", bench_decimal), ("float", bench_float)]:
+            total, tax, sum_time, tax_time = bench(amounts)
+            if exact_total is None:
+                exact_total, exact_tax = total, tax
+            print(f"{count:>9} {name:<18} sum {sum_time * 1e3:8.1f} ms  tax {tax_time * 1e3:8.1f} ms  "
+                  f"total {money.format_paise(total)} (off {total - exact_total} paise)  "
+                  f"tax {money.format_paise(tax)} (off {tax - exact_tax} paise)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# Bytes per domain object: slotted classes vs the same classes with a __dict__
+# Run from the repository root: python -m benchmarks.bench_object_memory --objects 1000000
+import argparse
+import tracemalloc
+
+from LedgerMaster import InventoryItem, LedgerAccount, Tax, Transaction
+from TallyPro import Ledger, TransactionLog, Voucher
+
+ACCOUNT_TYPES = ["Asset", "Liability", "Income", "Expense"]
+# Labels the slotted classes intern; the old classes kept one string per object
+LABEL_FIELDS = {LedgerAccount: "account_type", Transaction: "transaction_type", Voucher: "voucher_type"}
+
+
+# A subclass without __slots__ gets a per-instance __dict__ back; with the label
+# re-copied per object this matches the layout before slots and interning
+def old_layout(cls, build):
+    dict_cls = type(f"Dict{cls.__name__}", (cls,), {})
+    field = LABEL_FIELDS.get(cls)
+
+    def build_old(_, i):
+        obj = build(dict_cls, i)
+        if field:
+            setattr(obj, field, "".join(list(getattr(obj, field))))
+        return obj
+    return build_old
+
+
+def builders(shared_ledger):
+    # Type labels are built per object, as they would be when parsed from a file
+    return [
+        (LedgerAccount, lambda cls, i: cls(f"acct{i}", "".join(ACCOUNT_TYPES[i % 4]), float(i))),
+        (InventoryItem, lambda cls, i: cls(f"item{i}", float(i), i)),
+        (Transaction, lambda cls, i: cls(f"acct{i}", "".join(["cre", "dit"]), float(i))),
+        (Tax, lambda cls, i: cls(18)),
+        (Ledger, lambda cls, i: cls(f"ledger{i}", 0, TransactionLog())),
+        (Voucher, lambda cls, i: cls("".join(["Sal", "es"]), float(i), shared_ledger, shared_ledger)),
+    ]
+
+
+def bytes_per_object(cls, build, count):
+    tracemalloc.start()
+    objects = [build(cls, i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return size / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-object memory of ledger domain classes")
+    parser.add_argument("--objects", type=int, default=200_000)
+    args = parser.parse_args()
+
+    shared_ledger = Ledger("shared")
+    print(f"{'class':<14} {'before':>14} {'slotted':>10} {'saved':>8}")
+    for cls, build in builders(shared_ledger):
+        before = bytes_per_object(cls, old_layout(cls, build), args.objects)
+        after = bytes_per_object(cls, build, args.objects)
+        print(f"{cls.__name__:<14} {before:>12.1f} B {after:>8.1f} B {1 - after / before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# Throughput of the shard-parallel posting engine as the worker count grows
+# Run from the repository root: python -m benchmarks.bench_posting_engine --vouchers 1000000 --workers 1 2 4 8
+import argparse
+import contextlib
+import io
+import random
+
+from posting_engine import ShardedPostingEngine
+from TallyPro import Ledger, TallyPrimeSystem
+
+
+def make_system(ledgers):
+    with contextlib.redirect_stdout(io.StringIO()):
+        system = TallyPrimeSystem(filename=f"/nonexistent/bench_{ledgers}.json")
+    system.save_data = lambda: None  # Measure posting only, not persistence
+    for i in range(ledgers):
+        system.ledgers[f"ledger{i}"] = Ledger(f"ledger{i}")
+    return system
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shard-parallel posting benchmark")
+    parser.add_argument("--vouchers", type=int, default=200_000)
+    parser.add_argument("--ledgers", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vouchers = [("Journal", float(rng.randint(1, 10_000)),
+                 f"ledger{rng.randrange(args.ledgers)}", f"ledger{rng.randrange(args.ledgers)}")
+                for _ in range(args.vouchers)]
+
+    for workers in args.workers:
+        engine = ShardedPostingEngine(make_system(args.ledgers), workers)
+        engine.post_vouchers(vouchers)
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
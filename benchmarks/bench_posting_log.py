@@ -0,0 +1,68 @@
+# Rebuilding ledger balances from the binary posting log (posting_log.py) vs
+# re-parsing the same postings from JSON
+# Run from the repository root: python -m benchmarks.bench_posting_log --postings 10000000
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import posting_log
+
+
+def timed(fn):
+    start = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Binary posting log benchmark")
+    parser.add_argument("--postings", type=int, default=1_000_000)
+    parser.add_argument("--ledgers", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    directory = tempfile.mkdtemp()
+    log_path = os.path.join(directory, "postings.log")
+    json_path = os.path.join(directory, "postings.json")
+    rows = [(f"ledger{rng.randrange(args.ledgers)}", rng.randrange(-1_000_000, 1_000_000), "Sales", i)
+            for i in range(args.postings)]
+
+    writer = posting_log.PostingLogWriter(log_path)
+    _, write = timed(lambda: (writer.append_many(rows), writer.close()))
+    with open(json_path, "w") as f:
+        json.dump([{"ledger": name, "amount": amount, "type": voucher_type, "timestamp": timestamp}
+                   for name, amount, voucher_type, timestamp in rows], f)
+    del rows
+
+    def from_json():
+        totals = {}
+        with open(json_path) as f:
+            for posting in json.load(f):
+                totals[posting["ledger"]] = totals.get(posting["ledger"], 0) + posting["amount"]
+        return totals
+
+    def from_log():
+        reader = posting_log.PostingLogReader(log_path)
+        try:
+            return reader.balances()
+        finally:
+            reader.close()
+
+    json_totals, json_time = timed(from_json)
+    log_totals, log_time = timed(from_log)
+    assert all(abs(log_totals[name] - total / 100) < 1e-6 for name, total in json_totals.items())
+
+    size = os.path.getsize(log_path)
+    engine = "numpy bincount" if posting_log.np is not None else "struct.iter_unpack (no numpy)"
+    print(f"{args.postings:,} postings across {args.ledgers:,} ledgers")
+    print(f"append       {write:8.2f} s  {size / 1e6:8.1f} MB")
+    print(f"json rebuild {json_time:8.2f} s  {os.path.getsize(json_path) / 1e6:8.1f} MB")
+    print(f"log rebuild  {log_time:8.2f} s  {size / log_time / 1e9 if log_time else 0:8.2f} GB/s  ({engine})")
+
+
+if __name__ == "__main__":
+    main()
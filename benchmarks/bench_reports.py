@@ -0,0 +1,43 @@
+# Trial balance, P&L and balance sheet over a synthetic chart of accounts
+# Run from the repository root: python -m benchmarks.bench_reports --ledgers 1000000
+import argparse
+import time
+
+import numpy as np
+
+from reports import ReportEngine
+
+ACCOUNT_TYPES = np.array(["Asset", "Liability", "Income", "Expense"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vectorized report engine benchmark")
+    parser.add_argument("--ledgers", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    names = np.char.add("ledger", np.arange(args.ledgers).astype(str))
+    types = ACCOUNT_TYPES[rng.integers(0, len(ACCOUNT_TYPES), args.ledgers)]
+    balances = rng.normal(0, 10_000, args.ledgers).round(2)
+
+    start = time.perf_counter()
+    engine = ReportEngine(names, types, balances)
+    load = time.perf_counter() - start
+
+    timings = {}
+    for name, report in [("trial balance", engine.trial_balance),
+                         ("profit & loss", engine.profit_and_loss),
+                         ("balance sheet", engine.balance_sheet)]:
+        start = time.perf_counter()
+        report()
+        timings[name] = time.perf_counter() - start
+
+    print(f"{args.ledgers} ledgers, columns built in {load * 1e3:.1f} ms")
+    for name, elapsed in timings.items():
+        print(f"{name:<14} {elapsed * 1e3:8.1f} ms")
+    print(f"{'all reports':<14} {sum(timings.values()) * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# DBEntity create/select throughput with sqlite3's statement cache disabled
+# and enabled, plus the per-table timings the StatementCache collects
+# Run from the repository root: python -m benchmarks.bench_statement_cache --rows 50000
+import argparse
+import os
+import tempfile
+import time
+
+from Consoleapp import Database, DBEntity
+
+FIELDS = ["voucher_number", "voucher_type", "amount", "date"]
+
+
+def run(db_path, rows, cached_statements):
+    db = Database(db_path, verbose=False, cached_statements=cached_statements)
+    entity = DBEntity(db)
+    start = time.perf_counter()
+    with db.transaction():
+        for i in range(rows):
+            entity.create("vouchers", FIELDS, [f"V{i}", "Sales", float(i % 1000), "2024-04-01"])
+    insert = time.perf_counter() - start
+    start = time.perf_counter()
+    for i in range(rows):
+        entity.select("vouchers", ["amount"], "voucher_number = ?", [f"V{i}"])
+    select = time.perf_counter() - start
+    stats = db.statements.stats()
+    db.close()
+    return insert, select, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Statement cache benchmark")
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    for cached_statements in (0, 256):
+        path = os.path.join(directory, f"cache{cached_statements}.db")
+        insert, select, stats = run(path, args.rows, cached_statements)
+        print(f"cached_statements={cached_statements:<4} insert {args.rows / insert:>10,.0f} rows/s  "
+              f"select {args.rows / select:>10,.0f} rows/s  "
+              f"builder hits {stats['hits']:,} misses {stats['misses']}")
+        for table, totals in stats["tables"].items():
+            print(f"  {table:<10} {totals['calls']:>8,} calls  {totals['seconds']:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
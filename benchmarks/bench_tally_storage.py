@@ -0,0 +1,46 @@
+# Memory and load time of TallyPro postings: list of dicts vs TransactionLog columns
+# Run from the repository root: python -m benchmarks.bench_tally_storage --postings 1000000
+import argparse
+import json
+import time
+import tracemalloc
+
+from TallyPro import Ledger, TransactionLog
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    value = build()
+    elapsed = time.perf_counter() - start
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return value, size, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TallyPro posting storage benchmark")
+    parser.add_argument("--postings", type=int, default=1_000_000)
+    args = parser.parse_args()
+    count = args.postings
+
+    dicts, dict_bytes, _ = measure(
+        lambda: [{"type": "debit" if i % 2 else "credit", "amount": float(i % 5000)} for i in range(count)])
+    log, log_bytes, _ = measure(lambda: TransactionLog(dicts))
+
+    legacy_json = json.dumps({"name": "bench", "balance": 0, "transactions": dicts})
+    compact_json = json.dumps(Ledger("bench", 0, log).to_dict())
+    del dicts, log
+
+    _, _, legacy_load = measure(lambda: Ledger.from_dict(json.loads(legacy_json)))
+    _, _, compact_load = measure(lambda: Ledger.from_dict(json.loads(compact_json)))
+
+    print(f"{count} postings")
+    print(f"{'list of dicts':<16} {dict_bytes / count:7.1f} bytes/posting  "
+          f"file {len(legacy_json) / 1e6:7.1f} MB  load {legacy_load:6.3f} s")
+    print(f"{'TransactionLog':<16} {log_bytes / count:7.1f} bytes/posting  "
+          f"file {len(compact_json) / 1e6:7.1f} MB  load {compact_load:6.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# Deterministic synthetic ledger data for the benchmark suite. Every record
+# is a function of (seed, kind, index) alone: each generator draws from its
+# own Random seeded from the seed and the record kind, and names are derived
+# from indexes, so a scale can be streamed record by record (10M vouchers
+# never sit in memory) and two runs with the same seed see identical data.
+# Write the data set out to files with:
+#   python -m benchmarks.datagen --scale 100k --out bench_data
+import argparse
+import csv
+import os
+import random
+from datetime import date, timedelta
+
+import ledger_codec
+
+# A scale is the number of vouchers; the other record counts follow from it
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000, "10m": 10_000_000}
+ACCOUNT_TYPES = ("Asset", "Liability", "Income", "Expense", "Equity")
+VOUCHER_TYPES = ("Sales", "Purchase", "Payment", "Receipt", "Journal", "Contra")
+BUDGET_TYPES = ("Monthly", "Quarterly", "Yearly")
+FIRST_DAY = date(2024, 4, 1)  # Start of the financial year the data covers
+DAYS = 365
+# One voucher in five touches one of the "hot" accounts (bank, cash, the
+# big customers), as in a real ledger where a few accounts see most postings
+HOT_SHARE = 0.2
+HOT_ACCOUNTS = 20
+KIND_SEEDS = {"accounts": 1, "inventory": 2, "bills": 3, "budgets": 4, "vouchers": 5}
+
+
+# "10k" / "1m" / "250000" -> voucher count
+def parse_scale(text):
+    text = str(text).lower().replace("_", "")
+    if text in SCALES:
+        return SCALES[text]
+    return int(text)
+
+
+# Record counts for a voucher count
+def counts(scale):
+    accounts = max(HOT_ACCOUNTS, scale // 10)
+    return {
+        "accounts": accounts,
+        "inventory": max(10, scale // 10),
+        "bills": max(10, scale // 2),
+        "budgets": accounts // 2,
+        "vouchers": scale,
+    }
+
+
+def rng_for(kind, seed):
+    return random.Random(seed * 16 + KIND_SEEDS[kind])
+
+
+# Zero-padded names so name order matches index order
+def account_name(i):
+    return f"acct{i:08d}"
+
+
+def item_name(i):
+    return f"item{i:08d}"
+
+
+def customer_name(i):
+    return f"cust{i:08d}"
+
+
+# Whole paise between low and high rupees, as a rupee float with two decimals
+def amount(rng, low, high):
+    return rng.randrange(low * 100, high * 100) / 100
+
+
+def iso_day(rng):
+    return (FIRST_DAY + timedelta(days=rng.randrange(DAYS))).isoformat()
+
+
+# (name, account type, opening balance)
+def accounts(scale, seed=1):
+    rng = rng_for("accounts", seed)
+    for i in range(counts(scale)["accounts"]):
+        yield account_name(i), ACCOUNT_TYPES[rng.randrange(len(ACCOUNT_TYPES))], amount(rng, 0, 100_000)
+
+
+# (name, quantity, price)
+def inventory(scale, seed=1):
+    rng = rng_for("inventory", seed)
+    for i in range(counts(scale)["inventory"]):
+        yield item_name(i), rng.randrange(1, 1_000), amount(rng, 1, 50_000)
+
+
+# (bill number, customer name, amount due, ISO due date); customers are accounts
+def bills(scale, seed=1):
+    rng = rng_for("bills", seed)
+    n = counts(scale)
+    for i in range(n["bills"]):
+        yield f"B{i:09d}", account_name(rng.randrange(n["accounts"])), amount(rng, 100, 500_000), iso_day(rng)
+
+
+# (account name, budgeted amount, budget type) for the first half of the accounts
+def budgets(scale, seed=1):
+    rng = rng_for("budgets", seed)
+    for i in range(counts(scale)["budgets"]):
+        yield account_name(i), amount(rng, 10_000, 5_000_000), BUDGET_TYPES[rng.randrange(len(BUDGET_TYPES))]
+
+
+def pick_account(rng, accounts_count):
+    if rng.random() < HOT_SHARE:
+        return rng.randrange(HOT_ACCOUNTS)
+    return rng.randrange(accounts_count)
+
+
+# (voucher number, voucher type, amount, debit account, credit account, ISO date);
+# the two accounts always differ
+def vouchers(scale, seed=1):
+    rng = rng_for("vouchers", seed)
+    accounts_count = counts(scale)["accounts"]
+    for i in range(scale):
+        debit = pick_account(rng, accounts_count)
+        credit = pick_account(rng, accounts_count)
+        if credit == debit:
+            credit = (credit + 1) % accounts_count
+        yield (f"V{i:09d}", VOUCHER_TYPES[rng.randrange(len(VOUCHER_TYPES))], amount(rng, 1, 200_000),
+               account_name(debit), account_name(credit), iso_day(rng))
+
+
+# Vouchers in the CSV layout TallyPrimeSystem.import_vouchers reads
+def write_voucher_csv(path, scale, seed=1):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["voucher_type", "amount", "from_ledger", "to_ledger", "date"])
+        for _, voucher_type, value, debit, credit, day in vouchers(scale, seed):
+            writer.writerow([voucher_type, value, debit, credit, day])
+
+
+# One JSON array per line, for loading into other tools
+def write_jsonl(path, rows):
+    with open(path, "wb") as f:
+        for row in rows:
+            f.write(ledger_codec.dumps(list(row)) + b"\n")
+
+
+def write_all(directory, scale, seed=1):
+    os.makedirs(directory, exist_ok=True)
+    for kind, rows in (("accounts", accounts), ("inventory", inventory), ("bills", bills), ("budgets", budgets)):
+        write_jsonl(os.path.join(directory, f"{kind}.jsonl"), rows(scale, seed))
+    write_voucher_csv(os.path.join(directory, "vouchers.csv"), scale, seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic ledger data generator")
+    parser.add_argument("--scale", default="10k", help=f"voucher count or one of {', '.join(SCALES)}")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", default="bench_data")
+    args = parser.parse_args()
+
+    scale = parse_scale(args.scale)
+    write_all(args.out, scale, args.seed)
+    summary = ", ".join(f"{count:,} {kind}" for kind, count in counts(scale).items())
+    print(f"Wrote {summary} to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
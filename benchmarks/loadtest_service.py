@@ -0,0 +1,122 @@
+# Load test for ledger_service: p50/p99 latency and throughput as concurrency grows
+# Run from the repository root: python -m benchmarks.loadtest_service --concurrency 1 8 32 128
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ACCOUNTS = 100
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+
+    @classmethod
+    async def connect(cls, host, port):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def call(self, method, **params):
+        request = {"jsonrpc": "2.0", "id": next(self.ids), "method": method, "params": params}
+        self.writer.write(json.dumps(request).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_client(host, port, client_id, requests, write_ratio, latencies, rng):
+    client = await Client.connect(host, port)
+    for i in range(requests):
+        start = time.perf_counter()
+        if rng.random() < write_ratio:
+            debit, credit = rng.sample(range(ACCOUNTS), 2)
+            await client.call("voucher.post", voucher_number=f"L{client_id}-{i}-{rng.random()}",
+                              voucher_type="Journal", amount=1.0,
+                              debit_account=f"acct{debit}", credit_account=f"acct{credit}")
+        else:
+            await client.call("account.balance", account_name=f"acct{rng.randrange(ACCOUNTS)}")
+        latencies.append(time.perf_counter() - start)
+    await client.close()
+
+
+async def run_level(host, port, concurrency, requests, write_ratio, seed):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, i, requests, write_ratio, latencies,
+                                      random.Random(seed + i))
+                           for i in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(latencies) / elapsed, percentile(latencies, 0.50), percentile(latencies, 0.99)
+
+
+async def wait_for_server(host, port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            client = await Client.connect(host, port)
+            return client
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def main_async(args):
+    client = await wait_for_server(args.host, args.port)
+    for i in range(ACCOUNTS):
+        await client.call("account.create", account_name=f"acct{i}", account_type="Asset", balance=0.0)
+    await client.close()
+
+    print(f"{'clients':>8} {'req/sec':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for concurrency in args.concurrency:
+        rate, p50, p99 = await run_level(args.host, args.port, concurrency, args.requests,
+                                         args.write_ratio, args.seed)
+        print(f"{concurrency:>8} {rate:>10.0f} {p50 * 1e3:>8.2f} {p99 * 1e3:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ledger_service load test")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    parser.add_argument("--write-ratio", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--external", action="store_true",
+                        help="use a service that is already running instead of spawning one")
+    args = parser.parse_args()
+
+    if args.external:
+        asyncio.run(main_async(args))
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        server = subprocess.Popen([sys.executable, "-m", "ledger_service", "--host", args.host,
+                                   "--port", str(args.port), "--db", os.path.join(tmp, "load.db")],
+                                  stdout=subprocess.DEVNULL)
+        try:
+            asyncio.run(main_async(args))
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+# End-to-end benchmark suite. Drives LedgerMaster, TallyPrimeSystem and the
+# Consoleapp entity classes headlessly (console output goes to os.devnull)
+# over the deterministic data from benchmarks/datagen.py, and reports per
+# scenario the throughput and latency percentiles of each phase plus the
+# process's peak RSS. Every scenario runs in a fresh interpreter so
+# ru_maxrss is that scenario's own high-water mark.
+# Results are written to benchmarks/results/<commit>-<scale>.json; compare
+# two runs (e.g. before and after a change) with --compare.
+# Run from the repository root:
+#   python -m benchmarks.suite --scale 10k
+#   python -m benchmarks.suite --scale 1m --scenario consoleapp tally_import
+#   python -m benchmarks.suite --compare benchmarks/results/OLD.json benchmarks/results/NEW.json
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import ledger_codec
+from benchmarks import datagen
+
+try:
+    import resource
+except ImportError:  # Windows: peak RSS is reported as null
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+QUERIES = 10_000  # Point lookups per query phase, at most one per record
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+# Latency histogram with buckets ~1.6% wide (64 per power of two), so a
+# 10M-operation phase costs a few KB instead of an array of 10M timings
+class LatencyHistogram:
+    SUB_BITS = 6
+    SUB = 1 << SUB_BITS
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        if ns < 2 * self.SUB:
+            index = ns
+        else:
+            shift = ns.bit_length() - self.SUB_BITS - 1
+            index = shift * self.SUB + (ns >> shift)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    # Midpoint of the bucket holding index
+    def bucket_value(self, index):
+        if index < 2 * self.SUB:
+            return index
+        shift, mantissa = divmod(index, self.SUB)
+        shift, mantissa = shift - 1, mantissa + self.SUB
+        return (mantissa << shift) + (1 << shift) // 2
+
+    # Latency in ns at or below which `percent` of the operations completed
+    def percentile(self, percent):
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self.bucket_value(index), self.max)
+        return self.max
+
+
+def phase_result(ops, seconds, histogram=None):
+    result = {"ops": ops, "seconds": round(seconds, 6), "ops_per_sec": round(ops / seconds, 1) if seconds else None}
+    if histogram is not None:
+        result["latency_us"] = {f"p{p:g}": round(histogram.percentile(p) / 1000, 3) for p in PERCENTILES}
+        result["latency_us"]["max"] = round(histogram.max / 1000, 3)
+    return result
+
+
+# Collects the phases of one scenario
+class Recorder:
+    def __init__(self):
+        self.phases = {}
+
+    # Time op(*row) for every row. Throughput counts time spent inside op
+    # only, so generating the rows does not dilute it.
+    def each(self, name, rows, op):
+        histogram = LatencyHistogram()
+        clock = time.perf_counter_ns
+        for row in rows:
+            start = clock()
+            op(*row)
+            histogram.record(clock() - start)
+        self.phases[name] = phase_result(histogram.count, histogram.total / 1e9, histogram)
+
+    # Walk a keyset-paginated listing to its end; fetch(after) returns the next key
+    def pages(self, name, fetch):
+        histogram = LatencyHistogram()
+        clock = time.perf_counter_ns
+        after = None
+        while True:
+            start = clock()
+            after = fetch(after)
+            histogram.record(clock() - start)
+            if after is None:
+                break
+        self.phases[name] = phase_result(histogram.count, histogram.total / 1e9, histogram)
+
+    # One call that performs `ops` operations (a bulk import, a full scan)
+    def bulk(self, name, ops, run):
+        start = time.perf_counter()
+        value = run()
+        self.phases[name] = phase_result(ops, time.perf_counter() - start)
+        return value
+
+
+# Peak resident set size of this process in bytes (ru_maxrss is KB on Linux, bytes on macOS)
+def peak_rss():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+# `n` random record indexes below `count`, the same for every run with this seed
+def sample(count, seed, n=QUERIES):
+    rng = random.Random(seed)
+    return [rng.randrange(count) for _ in range(min(n, count))]
+
+
+# (account name, ISO day) pairs for as-of balance lookups
+def as_of_queries(accounts, seed):
+    rng = random.Random(seed)
+    for i in sample(accounts, seed):
+        yield datagen.account_name(i), datagen.iso_day(rng)
+
+
+def scenario_ledger_master(recorder, scale, seed, tmp):
+    from LedgerMaster import LedgerMaster
+
+    n = datagen.counts(scale)
+    path = os.path.join(tmp, "ledger_data.json")
+    # Write-behind mode: the default mode rewrites the whole file per mutation
+    master = LedgerMaster(path, write_behind=True)
+    recorder.each("create_account", datagen.accounts(scale, seed), master.create_account)
+    recorder.each("create_inventory_item",
+                  ((name, price, quantity) for name, quantity, price in datagen.inventory(scale, seed)),
+                  master.create_inventory_item)
+
+    def post(number, voucher_type, amount, debit, credit, day):
+        master.debit_account(debit, amount)
+        master.credit_account(credit, amount)
+    recorder.each("post_voucher", datagen.vouchers(scale, seed), post)
+    recorder.each("view_account", ((datagen.account_name(i),) for i in sample(n["accounts"], seed)),
+                  master.view_account)
+    # Prefixes that match up to 100 accounts each
+    recorder.each("search_accounts", ((datagen.account_name(i)[:-2],) for i in sample(n["accounts"], seed + 1)),
+                  master.search_accounts)
+    recorder.bulk("top_accounts", 1, lambda: master.top_accounts(100))
+    recorder.bulk("close", 1, master.close)
+    recorder.bulk("load_data", n["accounts"] + n["inventory"], lambda: LedgerMaster(path))
+
+
+# Interactive use: one create_ledger / create_voucher call per record, each
+# saving the ledgers it touched to the per-ledger store
+def scenario_tally(recorder, scale, seed, tmp):
+    from TallyPro import TallyPrimeSystem
+
+    n = datagen.counts(scale)
+    filename = os.path.join(tmp, "tally_data.json")
+    ledger_dir = os.path.join(tmp, "tally_ledgers")
+    system = TallyPrimeSystem(filename, ledger_dir=ledger_dir)
+    recorder.each("create_ledger", ((name,) for name, _, _ in datagen.accounts(scale, seed)), system.create_ledger)
+    recorder.each("create_voucher",
+                  ((voucher_type, amount, debit, credit, day)
+                   for _, voucher_type, amount, debit, credit, day in datagen.vouchers(scale, seed)),
+                  system.create_voucher)
+    recorder.each("balance_as_of",
+                  as_of_queries(n["accounts"], seed), system.balance_as_of)
+    # The first balance query builds the balance index over every ledger
+    recorder.bulk("top_ledgers", n["accounts"], lambda: system.top_ledgers(100))
+    system.close()
+    reopened = TallyPrimeSystem(filename, ledger_dir=ledger_dir)
+    recorder.bulk("load_ledgers", n["accounts"], lambda: sum(ledger.balance for ledger in reopened.ledgers.values()))
+
+
+# Batch use: ledgers loaded from one data file, vouchers bulk-imported from
+# CSV with every posting also appended to the binary posting log
+def scenario_tally_import(recorder, scale, seed, tmp):
+    from TallyPro import Ledger, LEDGER_FIELDS, TallyPrimeSystem
+
+    n = datagen.counts(scale)
+    filename = os.path.join(tmp, "tally_data.json")
+    with open(filename, "wb") as f:
+        f.write(ledger_codec.dumps({
+            "format": 2,
+            "ledger_fields": LEDGER_FIELDS,
+            "ledgers": [Ledger(name, balance).to_row() for name, _, balance in datagen.accounts(scale, seed)],
+        }))
+    csv_path = os.path.join(tmp, "vouchers.csv")
+    datagen.write_voucher_csv(csv_path, scale, seed)
+
+    system = recorder.bulk("load_data", n["accounts"], lambda: TallyPrimeSystem(
+        filename, posting_log_path=os.path.join(tmp, "tally_postings.log")))
+    recorder.bulk("import_vouchers", scale, lambda: system.import_vouchers(csv_path))
+    recorder.each("balance_as_of",
+                  as_of_queries(n["accounts"], seed), system.balance_as_of)
+    # The first balance query builds the balance index over every ledger
+    recorder.bulk("top_ledgers", n["accounts"], lambda: system.top_ledgers(100))
+    recorder.bulk("rebuild_balances_from_log", 2 * scale + n["accounts"], system.rebuild_balances_from_log)
+    system.close()
+
+
+# The Consoleapp entity classes on one SQLite database, as LedgerMasterApp wires them
+def scenario_consoleapp(recorder, scale, seed, tmp, pooled=False):
+    from Consoleapp import Account, Bill, Budget, Database, Inventory, Voucher
+
+    n = datagen.counts(scale)
+    db = Database(os.path.join(tmp, "ledgermaster.db"), pooled=pooled, verbose=False)
+    account, inventory, bill, budget, voucher = Account(db), Inventory(db), Bill(db), Budget(db), Voucher(db)
+    recorder.each("create_account", datagen.accounts(scale, seed), account.create_account)
+    recorder.each("create_inventory_item", datagen.inventory(scale, seed), inventory.create_inventory_item)
+    recorder.each("create_bill", datagen.bills(scale, seed), bill.create_bill)
+    recorder.each("set_budget", datagen.budgets(scale, seed), budget.set_budget)
+    recorder.each("post_voucher",
+                  ((number, voucher_type, amount, debit, credit)
+                   for number, voucher_type, amount, debit, credit, _ in datagen.vouchers(scale, seed)),
+                  voucher.post_voucher)
+    recorder.each("pay_bill", ((f"B{i:09d}",) for i in range(0, n["bills"], 3)), bill.pay_bill)
+    recorder.each("update_actual_in_budget",
+                  ((datagen.account_name(i), float(i % 10_000)) for i in sample(n["budgets"], seed)),
+                  budget.update_actual_in_budget)
+    recorder.each("get_balance", ((datagen.account_name(i),) for i in sample(n["accounts"], seed)),
+                  account.get_balance)
+
+    recorder.pages("list_bills_page", lambda after: bill.list_bills(status="Unpaid", after=after)[1])
+    recorder.bulk("trial_balance", n["accounts"], account.trial_balance)
+    recorder.bulk("verify_balances", n["accounts"] + scale, account.verify_balances)
+    db.close()
+
+
+SCENARIOS = {
+    "ledger_master": scenario_ledger_master,
+    "tally": scenario_tally,
+    "tally_import": scenario_tally_import,
+    "consoleapp": scenario_consoleapp,
+    "consoleapp_pooled": lambda recorder, scale, seed, tmp: scenario_consoleapp(recorder, scale, seed, tmp, True),
+}
+
+
+# Runs in the child process; returns the scenario's result dict
+def run_scenario(name, scale, seed):
+    recorder = Recorder()
+    baseline = peak_rss()
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as devnull, \
+            contextlib.redirect_stdout(devnull):
+        SCENARIOS[name](recorder, scale, seed, tmp)
+    return {
+        "seconds": round(time.perf_counter() - start, 3),
+        "baseline_rss_bytes": baseline,
+        "peak_rss_bytes": peak_rss(),
+        "phases": recorder.phases,
+    }
+
+
+def spawn_scenario(name, scale, seed):
+    command = [sys.executable, "-m", "benchmarks.suite", "--child", name, "--scale", str(scale), "--seed", str(seed)]
+    completed = subprocess.run(command, cwd=REPO_ROOT, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {"error": completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else
+                f"exit status {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+# (commit hash, True when the working tree has uncommitted changes)
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit, bool(status.strip())
+
+
+def results_path(commit, dirty, scale):
+    return os.path.join(RESULTS_DIR, f"{commit[:12]}{'-dirty' if dirty else ''}-{scale}.json")
+
+
+def mb(size):
+    return f"{size / 1e6:8.1f} MB" if size is not None else "       n/a"
+
+
+def print_scenario(name, result):
+    if "error" in result:
+        print(f"{name}: FAILED ({result['error']})")
+        return
+    print(f"{name}: {result['seconds']:.2f} s, peak RSS {mb(result['peak_rss_bytes']).strip()}")
+    for phase, stats in result["phases"].items():
+        line = f"  {phase:<26} {stats['ops']:>11,} ops {stats['ops_per_sec'] or 0:>13,.0f} ops/s"
+        latency = stats.get("latency_us")
+        if latency:
+            line += "  " + "  ".join(f"{key} {value:>9,.1f}" for key, value in latency.items()) + " us"
+        print(line)
+
+
+# Throughput, p99 and peak RSS of every scenario/phase present in both runs.
+# Lines where throughput fell or p99 grew by more than `threshold` percent
+# are marked, and their count is returned.
+def compare(old_path, new_path, threshold):
+    with open(old_path) as f:
+        old = json.load(f)
+    with open(new_path) as f:
+        new = json.load(f)
+    print(f"{old['commit'][:12]} -> {new['commit'][:12]}  (scale {old['scale']:,} -> {new['scale']:,})")
+    regressions = 0
+
+    def change(before, after):
+        return (after - before) / before * 100 if before else 0.0
+
+    for name, new_result in new["scenarios"].items():
+        old_result = old["scenarios"].get(name)
+        if old_result is None or "error" in old_result or "error" in new_result:
+            continue
+        rss = change(old_result["peak_rss_bytes"] or 0, new_result["peak_rss_bytes"] or 0)
+        print(f"{name}: peak RSS {mb(old_result['peak_rss_bytes']).strip()} -> "
+              f"{mb(new_result['peak_rss_bytes']).strip()} ({rss:+.1f}%)")
+        for phase, after in new_result["phases"].items():
+            before = old_result["phases"].get(phase)
+            if before is None:
+                continue
+            throughput = change(before["ops_per_sec"] or 0, after["ops_per_sec"] or 0)
+            line = f"  {phase:<26} {before['ops_per_sec'] or 0:>13,.0f} -> {after['ops_per_sec'] or 0:>13,.0f} ops/s " \
+                   f"({throughput:+6.1f}%)"
+            flagged = throughput < -threshold
+            if "latency_us" in before and "latency_us" in after:
+                p99 = change(before["latency_us"]["p99"], after["latency_us"]["p99"])
+                line += f"  p99 {before['latency_us']['p99']:>9,.1f} -> {after['latency_us']['p99']:>9,.1f} us ({p99:+6.1f}%)"
+                flagged = flagged or p99 > threshold
+            if flagged:
+                regressions += 1
+                line += "  <-- regression"
+            print(line)
+    print(f"{regressions} phase(s) regressed by more than {threshold:g}%")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LedgerMaster benchmark suite")
+    parser.add_argument("--scale", default="10k", help=f"voucher count or one of {', '.join(datagen.SCALES)}")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>-<scale>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two results files")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    parser.add_argument("--child", choices=list(SCENARIOS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(1 if compare(*args.compare, args.threshold) else 0)
+
+    scale = datagen.parse_scale(args.scale)
+    if args.child:
+        print(json.dumps(run_scenario(args.child, scale, args.seed)))
+        return
+
+    commit, dirty = git_revision()
+    counts = ", ".join(f"{count:,} {kind}" for kind, count in datagen.counts(scale).items())
+    print(f"Commit {commit[:12]}{' (dirty)' if dirty else ''}, seed {args.seed}: {counts}")
+    scenarios = {}
+    for name in args.scenario:
+        scenarios[name] = spawn_scenario(name, scale, args.seed)
+        print_scenario(name, scenarios[name])
+
+    results = {
+        "commit": commit,
+        "dirty": dirty,
+        "scale": scale,
+        "seed": args.seed,
+        "counts": datagen.counts(scale),
+        "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_codec": ledger_codec.CODEC,
+        "scenarios": scenarios,
+    }
+    path = args.output or results_path(commit, dirty, scale)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+        f.write("\n")
+    print(f"Results written to {os.path.relpath(path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import numpy as np
+
+import money
+
+# Batch GST over whole sales registers. Amounts become int64 paise, rates are
+# checked against the GST slabs, tax is computed per line in one vectorized
+# pass (rounded half away from zero to the paisa) and totals per slab and per
+# HSN code are counted with bincount instead of a Python loop.
+GST_SLABS = (0, 5, 12, 18, 28)
+SLAB_BASIS_POINTS = np.array([slab * 100 for slab in GST_SLABS], dtype=np.int64)
+
+
+# Totals for a batch, in paise. Summaries of chunks of one register merge()
+# into the summary of the whole register.
+class GstSummary:
+    __slots__ = ("slab_lines", "slab_taxable", "slab_tax", "hsn", "skipped_lines")
+
+    def __init__(self, slab_lines, slab_taxable, slab_tax, hsn=None, skipped_lines=0):
+        self.slab_lines = slab_lines
+        self.slab_taxable = slab_taxable
+        self.slab_tax = slab_tax
+        self.hsn = hsn or {}  # HSN code -> [lines, taxable paise, tax paise]
+        self.skipped_lines = skipped_lines  # Lines left out for a missing amount or invalid rate
+
+    @classmethod
+    def empty(cls):
+        slabs = len(GST_SLABS)
+        return cls(np.zeros(slabs, dtype=np.int64), np.zeros(slabs, dtype=np.int64), np.zeros(slabs, dtype=np.int64))
+
+    def merge(self, other):
+        self.skipped_lines += other.skipped_lines
+        self.slab_lines += other.slab_lines
+        self.slab_taxable += other.slab_taxable
+        self.slab_tax += other.slab_tax
+        for code, (lines, taxable, tax) in other.hsn.items():
+            totals = self.hsn.setdefault(code, [0, 0, 0])
+            totals[0] += lines
+            totals[1] += taxable
+            totals[2] += tax
+        return self
+
+    @property
+    def total_tax(self):
+        return int(self.slab_tax.sum())
+
+    # (rate %, lines, taxable, tax) per slab with amounts in rupees
+    def slab_rows(self):
+        return [(rate, int(lines), int(taxable) / money.SCALE, int(tax) / money.SCALE)
+                for rate, lines, taxable, tax
+                in zip(GST_SLABS, self.slab_lines, self.slab_taxable, self.slab_tax)]
+
+    # (HSN code, lines, taxable, tax) per HSN code with amounts in rupees
+    def hsn_rows(self):
+        return [(code, lines, taxable / money.SCALE, tax / money.SCALE)
+                for code, (lines, taxable, tax) in sorted(self.hsn.items())]
+
+
+# Slab index per line; raises ValueError for rates that are not a GST slab
+def slab_index(rates_bp):
+    index = np.searchsorted(SLAB_BASIS_POINTS, rates_bp)
+    index = np.minimum(index, len(GST_SLABS) - 1)
+    invalid = SLAB_BASIS_POINTS[index] != rates_bp
+    if invalid.any():
+        bad = np.unique(rates_bp[invalid]) / 100
+        raise ValueError(f"Rates {bad.tolist()} are not GST slabs {list(GST_SLABS)}")
+    return index
+
+
+# Lines with an amount and a GST slab rate; blank cells read as NaN and fail
+def valid_lines(amounts, rates):
+    amounts = np.asarray(amounts, dtype=np.float64)
+    rates = np.broadcast_to(np.asarray(rates, dtype=np.float64), amounts.shape)
+    valid = np.isfinite(amounts) & np.isfinite(rates)
+    valid[valid] = np.isin(np.rint(rates[valid] * 100).astype(np.int64), SLAB_BASIS_POINTS)
+    return valid
+
+
+# Sum of int64 values per group. bincount adds in float64, which is exact
+# while each group total stays below 2**53 paise (about 90 trillion rupees).
+def group_sum(index, values, groups):
+    return np.rint(np.bincount(index, weights=values, minlength=groups)).astype(np.int64)
+
+
+# amounts: rupees per line; rates: percent per line or one rate for all lines;
+# hsn_codes: optional code per line (an array, or a pandas categorical column).
+# Returns (tax per line as int64 paise, GstSummary). Raises ValueError for
+# missing (NaN) amounts or rates and for rates that are not a GST slab.
+def compute_gst(amounts, rates, hsn_codes=None):
+    amounts = np.asarray(amounts, dtype=np.float64)
+    rates = np.asarray(rates, dtype=np.float64)
+    for label, column in (("amount", amounts), ("GST rate", rates)):
+        missing = np.count_nonzero(~np.isfinite(column))
+        if missing:
+            raise ValueError(f"{missing} line(s) have no {label}")
+    amounts_paise = money.paise_column(amounts)
+    rates_bp = np.rint(rates * 100).astype(np.int64)
+    rates_bp = np.broadcast_to(rates_bp, amounts_paise.shape)
+    index = slab_index(rates_bp)
+    tax = money.tax_paise(amounts_paise, rates_bp)
+
+    slabs = len(GST_SLABS)
+    summary = GstSummary(np.bincount(index, minlength=slabs).astype(np.int64),
+                         group_sum(index, amounts_paise, slabs),
+                         group_sum(index, tax, slabs))
+    if hsn_codes is not None:
+        if hasattr(hsn_codes, "cat"):  # pandas categorical: reuse its codes
+            codes = hsn_codes.cat.codes.to_numpy()
+            labels = np.asarray(hsn_codes.cat.categories)
+        else:
+            labels, codes = np.unique(np.asarray(hsn_codes), return_inverse=True)
+        present = codes >= 0  # Missing HSN codes are left out of the HSN table
+        codes = codes[present]
+        groups = len(labels)
+        lines = np.bincount(codes, minlength=groups)
+        taxable = group_sum(codes, amounts_paise[present], groups)
+        taxes = group_sum(codes, tax[present], groups)
+        summary.hsn = {str(labels[i]): [int(lines[i]), int(taxable[i]), int(taxes[i])]
+                       for i in np.flatnonzero(lines)}
+    return tax, summary
+
+
+# Batch GST straight from a sales register DataFrame such as the one tallu.py
+# loads. With drop_invalid, lines without an amount or a slab rate are left
+# out and counted in summary.skipped_lines instead of raising; the tax column
+# then covers the remaining lines only.
+def compute_gst_from_frame(df, amount_column="Amount", rate_column="GST Rate", hsn_column="HSN Code",
+                           drop_invalid=False):
+    skipped = 0
+    if drop_invalid:
+        valid = valid_lines(df[amount_column].to_numpy(), df[rate_column].to_numpy())
+        skipped = len(df) - int(np.count_nonzero(valid))
+        if skipped:
+            df = df[valid]
+    hsn = df[hsn_column] if hsn_column in df.columns else None
+    tax, summary = compute_gst(df[amount_column].to_numpy(), df[rate_column].to_numpy(), hsn)
+    summary.skipped_lines = skipped
+    return tax, summary
@@ -0,0 +1,212 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+import warnings
+from bisect import bisect_left
+
+# Opt-in metrics for the ledger front ends, switched by environment variables
+# read once at import:
+#   LEDGER_METRICS=metrics.json    record metrics and write them at exit; a
+#                                  .prom or .txt path gets Prometheus text format
+#   LEDGER_PROFILE=run.prof        run cProfile for the whole process and save
+#                                  its stats at exit (load with pstats)
+#   LEDGER_TRACEMALLOC=10          trace allocations with this many frames and
+#                                  add the peak and top allocation sites to the
+#                                  metrics dump (tracemalloc.json when
+#                                  LEDGER_METRICS is unset)
+# When LEDGER_METRICS is unset, timed() returns the function unchanged and
+# measure() hands back one shared no-op span, so the hooks cost a call at most.
+METRICS_PATH = os.environ.get("LEDGER_METRICS")
+PROFILE_PATH = os.environ.get("LEDGER_PROFILE")
+TRACEMALLOC_PATH = "tracemalloc.json"
+
+
+# A bad value must not break every module that imports this one: warn and
+# leave tracing off
+def tracemalloc_frames(value):
+    if not value:
+        return 0
+    try:
+        frames = int(value)
+    except ValueError:
+        frames = -1
+    if frames < 0:
+        warnings.warn(f"LEDGER_TRACEMALLOC={value!r} is not a frame count; allocation tracing is off")
+        return 0
+    return frames
+
+
+TRACEMALLOC_FRAMES = tracemalloc_frames(os.environ.get("LEDGER_TRACEMALLOC"))
+ENABLED = bool(METRICS_PATH)
+
+# Upper bounds in seconds of the latency histogram buckets (plus +Inf)
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+
+class Metric:
+    __slots__ = ("count", "seconds", "buckets", "bytes_read", "bytes_written")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Last bucket is +Inf
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "seconds": self.seconds,
+            "buckets": dict(zip([str(bound) for bound in BUCKETS] + ["+Inf"], self.buckets)),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+        }
+
+
+metrics = {}
+lock = threading.Lock()
+
+
+def record(name, seconds, bytes_read=0, bytes_written=0):
+    with lock:
+        metric = metrics.get(name)
+        if metric is None:
+            metric = metrics[name] = Metric()
+        metric.count += 1
+        metric.seconds += seconds
+        metric.buckets[bisect_left(BUCKETS, seconds)] += 1
+        metric.bytes_read += bytes_read
+        metric.bytes_written += bytes_written
+
+
+# Bytes moved by an operation that is timed elsewhere (e.g. by @timed)
+def add_bytes(name, bytes_read=0, bytes_written=0):
+    if not ENABLED:
+        return
+    with lock:
+        metric = metrics.get(name)
+        if metric is None:
+            metric = metrics[name] = Metric()
+        metric.bytes_read += bytes_read
+        metric.bytes_written += bytes_written
+
+
+# Timed block; set .bytes_read / .bytes_written on the span inside the block
+class Span:
+    __slots__ = ("name", "start", "bytes_read", "bytes_written")
+
+    def __init__(self, name):
+        self.name = name
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start, self.bytes_read, self.bytes_written)
+        return False
+
+
+class NullSpan:
+    __slots__ = ("bytes_read", "bytes_written")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+NULL_SPAN = NullSpan()
+
+
+def measure(name):
+    return Span(name) if ENABLED else NULL_SPAN
+
+
+# Decorator recording every call of the function under `name`
+# (default module.qualname)
+def timed(name=None):
+    def decorate(function):
+        if not ENABLED:
+            return function
+        metric_name = name or f"{function.__module__}.{function.__qualname__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(metric_name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    with lock:
+        data = {"metrics": {name: metric.to_dict() for name, metric in sorted(metrics.items())}}
+    if TRACEMALLOC_FRAMES:
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+            data["tracemalloc"] = {
+                "current_bytes": current,
+                "peak_bytes": peak,
+                "top": [{"site": str(stat.traceback), "bytes": stat.size, "count": stat.count} for stat in top],
+            }
+    return data
+
+
+def metric_label(name):
+    return name.replace("\\", "\\\\").replace('"', '\\"')
+
+
+# Each metric family is written as one group, as the text format requires
+def to_prometheus(data):
+    seconds = ["# TYPE ledger_operation_seconds histogram"]
+    read = ["# TYPE ledger_operation_bytes_read_total counter"]
+    written = ["# TYPE ledger_operation_bytes_written_total counter"]
+    for name, metric in data["metrics"].items():
+        label = f'operation="{metric_label(name)}"'
+        cumulative = 0
+        for bound, count in metric["buckets"].items():
+            cumulative += count
+            seconds.append(f'ledger_operation_seconds_bucket{{{label},le="{bound}"}} {cumulative}')
+        seconds.append(f"ledger_operation_seconds_sum{{{label}}} {metric['seconds']}")
+        seconds.append(f"ledger_operation_seconds_count{{{label}}} {metric['count']}")
+        read.append(f"ledger_operation_bytes_read_total{{{label}}} {metric['bytes_read']}")
+        written.append(f"ledger_operation_bytes_written_total{{{label}}} {metric['bytes_written']}")
+    lines = seconds + read + written
+    if "tracemalloc" in data:
+        lines.append("# TYPE ledger_tracemalloc_peak_bytes gauge")
+        lines.append(f"ledger_tracemalloc_peak_bytes {data['tracemalloc']['peak_bytes']}")
+    return "\n".join(lines) + "\n"
+
+
+def dump(path=None):
+    path = path or METRICS_PATH or TRACEMALLOC_PATH
+    data = snapshot()
+    text = to_prometheus(data) if path.endswith((".prom", ".txt")) else json.dumps(data, indent=2)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+if ENABLED or TRACEMALLOC_FRAMES:
+    atexit.register(dump)
+
+if TRACEMALLOC_FRAMES:
+    import tracemalloc
+    tracemalloc.start(TRACEMALLOC_FRAMES)
+
+if PROFILE_PATH:
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    atexit.register(lambda: (profiler.disable(), profiler.dump_stats(PROFILE_PATH)))
@@ -0,0 +1,51 @@
+import json
+
+# JSON codec for ledger_data.json and tally_data.json: orjson or msgspec when
+# importable, the standard library otherwise. dumps() always returns compact
+# UTF-8 bytes and loads() accepts bytes or str, so files are opened in binary.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if orjson is not None:
+    CODEC = "orjson"
+    DecodeError = (ValueError,)  # orjson.JSONDecodeError subclasses ValueError
+
+    def dumps(obj):
+        return orjson.dumps(obj)
+
+    def loads(data):
+        return orjson.loads(data)
+
+elif msgspec is not None:
+    CODEC = "msgspec"
+    DecodeError = (ValueError, msgspec.DecodeError)
+    _encoder = msgspec.json.Encoder()
+    _decoder = msgspec.json.Decoder()
+
+    def dumps(obj):
+        return _encoder.encode(obj)
+
+    def loads(data):
+        return _decoder.decode(data)
+
+else:
+    CODEC = "json"
+    DecodeError = (ValueError,)  # json.JSONDecodeError subclasses ValueError
+
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    def loads(data):
+        return json.loads(data)
+
+
+def load_file(path):
+    with open(path, "rb") as file:
+        return loads(file.read())
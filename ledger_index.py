@@ -0,0 +1,140 @@
+from bisect import bisect_left, bisect_right, insort
+
+# In-memory secondary indexes over account/ledger/item names. Each one is a
+# sorted Python list searched with bisect, so lookups are O(log n); inserts
+# and removals are O(log n) to locate plus a memmove of the list tail.
+
+
+# Names in sorted order for prefix and range queries
+class NameIndex:
+    __slots__ = ("names",)
+
+    def __init__(self, names=()):
+        self.names = sorted(names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        i = bisect_left(self.names, name)
+        return i < len(self.names) and self.names[i] == name
+
+    def add(self, name):
+        i = bisect_left(self.names, name)
+        if i == len(self.names) or self.names[i] != name:
+            self.names.insert(i, name)
+
+    def discard(self, name):
+        i = bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            del self.names[i]
+
+    # Names with low <= name < high; either bound may be None for open-ended
+    def range(self, low=None, high=None, limit=None):
+        start = 0 if low is None else bisect_left(self.names, low)
+        end = len(self.names) if high is None else bisect_left(self.names, high)
+        if limit is not None:
+            end = min(end, start + limit)
+        return self.names[start:end]
+
+    # Names starting with prefix: the range [prefix, prefix with its last character bumped)
+    def prefix(self, prefix, limit=None):
+        if not prefix:
+            return self.range(limit=limit)
+        return self.range(prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1), limit)
+
+
+# account_type -> NameIndex of the accounts of that type
+class TypeIndex:
+    __slots__ = ("by_type",)
+
+    def __init__(self, pairs=()):
+        grouped = {}
+        for name, account_type in pairs:
+            grouped.setdefault(account_type, []).append(name)
+        self.by_type = {account_type: NameIndex(names) for account_type, names in grouped.items()}
+
+    def add(self, name, account_type):
+        index = self.by_type.get(account_type)
+        if index is None:
+            index = self.by_type[account_type] = NameIndex()
+        index.add(name)
+
+    def discard(self, name, account_type):
+        index = self.by_type.get(account_type)
+        if index is not None:
+            index.discard(name)
+
+    def types(self):
+        return sorted(self.by_type)
+
+    def names(self, account_type, prefix="", limit=None):
+        index = self.by_type.get(account_type)
+        return index.prefix(prefix, limit) if index is not None else []
+
+    def count(self, account_type):
+        index = self.by_type.get(account_type)
+        return len(index) if index is not None else 0
+
+
+# (balance, name) pairs in balance order for top-N and balance range queries
+class BalanceIndex:
+    __slots__ = ("entries",)
+
+    def __init__(self, pairs=()):
+        self.entries = sorted((balance, name) for name, balance in pairs)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, name, balance):
+        insort(self.entries, (balance, name))
+
+    def discard(self, name, balance):
+        i = bisect_left(self.entries, (balance, name))
+        if i < len(self.entries) and self.entries[i] == (balance, name):
+            del self.entries[i]
+
+    def update(self, name, old_balance, new_balance):
+        if old_balance != new_balance:
+            self.discard(name, old_balance)
+            self.add(name, new_balance)
+
+    # [(name, balance)] with the largest balances first
+    def top(self, n):
+        return [(name, balance) for balance, name in reversed(self.entries[-n:])] if n > 0 else []
+
+    # [(name, balance)] with the smallest balances first
+    def bottom(self, n):
+        return [(name, balance) for balance, name in self.entries[:n]]
+
+    # [(name, balance)] with low <= balance <= high, in balance order
+    def between(self, low, high):
+        start = bisect_left(self.entries, (low,))
+        end = bisect_right(self.entries, (high, chr(0x10FFFF)))
+        return [(name, balance) for balance, name in self.entries[start:end]]
+
+
+# The three indexes over one set of accounts, kept in step by add/remove/update_balance
+class AccountIndex:
+    __slots__ = ("names", "types", "balances")
+
+    # accounts: iterable of (name, account_type, balance)
+    def __init__(self, accounts=()):
+        accounts = list(accounts)
+        self.names = NameIndex(name for name, _, _ in accounts)
+        self.types = TypeIndex((name, account_type) for name, account_type, _ in accounts)
+        self.balances = BalanceIndex((name, balance) for name, _, balance in accounts)
+
+    def add(self, name, account_type, balance):
+        self.names.add(name)
+        self.types.add(name, account_type)
+        self.balances.add(name, balance)
+
+    def remove(self, name, account_type, balance):
+        self.names.discard(name)
+        self.types.discard(name, account_type)
+        self.balances.discard(name, balance)
+
+    def update_balance(self, name, old_balance, new_balance):
+        self.balances.update(name, old_balance, new_balance)
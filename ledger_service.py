@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+from Consoleapp import Account, Bill, Budget, Database, Inventory, Voucher
+
+
+# JSON-RPC 2.0 over TCP, one JSON object per line. Database calls run on a
+# thread pool against a pooled Database: reads use per-thread connections and
+# writes from concurrent requests are group-committed by the single writer.
+class LedgerService:
+    def __init__(self, db_path='ledgermaster.db', workers=32):
+        self.db = Database(db_path, pooled=True, verbose=False)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ledger-rpc")
+        account = Account(self.db)
+        inventory = Inventory(self.db)
+        bill = Bill(self.db)
+        budget = Budget(self.db)
+        voucher = Voucher(self.db)
+        self.methods = {
+            "account.create": account.create_account,
+            "account.credit": account.credit_account,
+            "account.balance": account.get_balance,
+            "account.trial_balance": lambda: [list(row) for row in account.trial_balance()],
+            "account.verify": lambda: [list(row) for row in account.verify_balances()],
+            "inventory.create": inventory.create_inventory_item,
+            "inventory.list": paged(inventory.list_inventory),
+            "bill.create": bill.create_bill,
+            "bill.pay": bill.pay_bill,
+            "bill.list": paged(bill.list_bills),
+            "budget.set": budget.set_budget,
+            "budget.update_actual": budget.update_actual_in_budget,
+            "budget.list": paged(budget.list_budgets),
+            "voucher.create": voucher.create_voucher,
+            "voucher.post": voucher.post_voucher,
+            "voucher.list": paged(voucher.list_vouchers),
+            "db.stats": self.db.statements.stats,
+        }
+        self.signatures = {}  # Method name -> inspect.Signature, filled on first call
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self.dispatch(line)
+                try:
+                    payload = json.dumps(response)
+                except (TypeError, ValueError) as error:
+                    payload = json.dumps(error_response(response.get("id"), -32603, f"Internal error: {error}"))
+                writer.write(payload.encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    # Every failure becomes a JSON-RPC error response; nothing a client sends
+    # may end the connection
+    async def dispatch(self, line):
+        try:
+            request = json.loads(line)
+        except ValueError:  # JSONDecodeError, or bytes that are not UTF-8
+            return error_response(None, -32700, "Parse error")
+        if not isinstance(request, dict):
+            return error_response(None, -32600, "Invalid Request")
+        request_id = request.get("id")
+        name = request.get("method")
+        method = self.methods.get(name) if isinstance(name, str) else None
+        if method is None:
+            return error_response(request_id, -32601, "Method not found")
+        params = request.get("params") or {}
+        if not isinstance(params, (dict, list)):
+            return error_response(request_id, -32602, "Invalid params: expected an object or an array")
+        signature = self.signatures.get(name)
+        if signature is None:
+            signature = self.signatures[name] = inspect.signature(method)
+        # Only a call that does not fit the signature is the client's fault;
+        # a TypeError raised inside the method is an internal error
+        try:
+            bound = signature.bind(**params) if isinstance(params, dict) else signature.bind(*params)
+        except TypeError as error:
+            return error_response(request_id, -32602, f"Invalid params: {error}")
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(self.executor, lambda: method(*bound.args, **bound.kwargs))
+        except sqlite3.Error as error:
+            return error_response(request_id, -32000, f"Database error: {error}")
+        except Exception as error:
+            return error_response(request_id, -32603, f"Internal error: {error!r}")
+        return {"jsonrpc": "2.0", "id": request_id, "result": result}
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"LedgerMaster service listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown()
+        self.db.close()
+
+
+# Keyset pages become {"rows": [...], "next": key or null}
+def page(result):
+    rows, next_key = result
+    return {"rows": [dict(row) for row in rows], "next": next_key}
+
+
+# A listing method returning pages; wraps keeps its signature for dispatch
+def paged(list_method):
+    @functools.wraps(list_method)
+    def call(*args, **kwargs):
+        return page(list_method(*args, **kwargs))
+    return call
+
+
+def error_response(request_id, code, message):
+    return {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LedgerMaster JSON-RPC service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default="ledgermaster.db")
+    parser.add_argument("--workers", type=int, default=32)
+    args = parser.parse_args()
+
+    service = LedgerService(args.db, args.workers)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Shutting down.")
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
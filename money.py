@@ -0,0 +1,145 @@
+import sqlite3
+from array import array
+from decimal import ROUND_HALF_UP, Decimal
+
+# Fixed-point money: amounts are whole paise (1/100 rupee) held in Python ints,
+# SQLite INTEGER columns, array('q') or NumPy int64 columns. Sums are exact;
+# rounding happens once, half away from zero, when a rate is applied.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SCALE = 100
+BASIS_POINTS = 10_000  # Rates are given in basis points: 18% == 1800
+
+
+# Parse str/int/float/Decimal into paise. Floats go through repr() so 0.1
+# becomes exactly 10 paise rather than its binary approximation.
+def to_paise(value):
+    if isinstance(value, int):
+        return value * SCALE
+    if isinstance(value, float):
+        value = repr(value)
+    return int((Decimal(value) * SCALE).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_paise(paise):
+    return Decimal(paise) / SCALE
+
+
+def format_paise(paise):
+    sign = "-" if paise < 0 else ""
+    rupees, rest = divmod(abs(paise), SCALE)
+    return f"{sign}{rupees}.{rest:02d}"
+
+
+# Percent to basis points is the same x100 exact parse used for amounts
+def rate_to_basis_points(rate_percent):
+    return to_paise(rate_percent)
+
+
+class Money:
+    __slots__ = ("paise",)
+
+    def __init__(self, paise=0):
+        self.paise = int(paise)
+
+    @classmethod
+    def of(cls, value):
+        return cls(to_paise(value))
+
+    def __add__(self, other):
+        return Money(self.paise + other.paise)
+
+    def __sub__(self, other):
+        return Money(self.paise - other.paise)
+
+    def __neg__(self):
+        return Money(-self.paise)
+
+    def __mul__(self, factor):
+        if not isinstance(factor, int):
+            return NotImplemented
+        return Money(self.paise * factor)
+
+    __rmul__ = __mul__
+
+    def __eq__(self, other):
+        return isinstance(other, Money) and self.paise == other.paise
+
+    def __lt__(self, other):
+        return self.paise < other.paise
+
+    def __le__(self, other):
+        return self.paise <= other.paise
+
+    def __hash__(self):
+        return hash(self.paise)
+
+    def __float__(self):
+        return self.paise / SCALE
+
+    def __str__(self):
+        return format_paise(self.paise)
+
+    def __repr__(self):
+        return f"Money('{format_paise(self.paise)}')"
+
+    # Tax at a rate in percent, rounded half away from zero to the paisa
+    def tax(self, rate_percent):
+        return Money(round_div(self.paise * rate_to_basis_points(rate_percent), BASIS_POINTS))
+
+
+# Money values are stored in SQLite as INTEGER paise
+sqlite3.register_adapter(Money, lambda money: money.paise)
+
+
+# Integer division rounding half away from zero; works on ints and int64 arrays
+def round_div(numerator, denominator):
+    if np is not None and isinstance(numerator, np.ndarray):
+        return np.sign(numerator) * ((np.abs(numerator) + denominator // 2) // denominator)
+    quotient = (abs(numerator) + denominator // 2) // denominator
+    return quotient if numerator >= 0 else -quotient
+
+
+# Column of paise from floats/strings/ints: int64 NumPy array, or array('q')
+# without NumPy. Both paths round exactly like to_paise. In binary, x * 100
+# can land just off a half paisa that the decimal value sits on
+# (1.005 * 100 == 100.49999999999999), so lines within a few ulps of a tie
+# go through to_paise one by one.
+def paise_column(values):
+    if np is not None:
+        floats = np.asarray(values, dtype=np.float64)
+        scaled = np.abs(floats * SCALE)
+        paise = (np.sign(floats) * np.floor(scaled + 0.5)).astype(np.int64)
+        near_tie = np.abs(scaled % 1 - 0.5) <= np.maximum(1e-6, 8 * np.spacing(scaled))
+        for i in np.flatnonzero(near_tie):
+            paise[i] = to_paise(float(floats[i]))
+        return paise
+    return array('q', (to_paise(value) for value in values))
+
+
+# Exact total of a paise column
+def sum_paise(column):
+    if np is not None and isinstance(column, np.ndarray):
+        return int(column.sum(dtype=np.int64))
+    return sum(column)
+
+
+# Tax per line for a paise column. rates_bp is one rate or a column of rates
+# in basis points; each line is rounded half away from zero to the paisa.
+def tax_paise(column, rates_bp):
+    if np is not None:
+        amounts = np.asarray(column, dtype=np.int64)
+        return round_div(amounts * np.asarray(rates_bp, dtype=np.int64), BASIS_POINTS)
+    if isinstance(rates_bp, int):
+        return array('q', (round_div(amount * rates_bp, BASIS_POINTS) for amount in column))
+    return array('q', (round_div(amount * rate, BASIS_POINTS) for amount, rate in zip(column, rates_bp)))
+
+
+# Round a paise column to a coarser unit, e.g. unit=100 for whole rupees
+def round_paise(column, unit=SCALE):
+    if np is not None and isinstance(column, np.ndarray):
+        return round_div(column, unit) * unit
+    return array('q', (round_div(amount, unit) * unit for amount in column))
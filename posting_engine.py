@@ -0,0 +1,132 @@
+import math
+import os
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from TallyPro import TRANSACTION_TYPE_CODES, TRANSACTION_TYPES, TransactionLog, day_ordinal
+
+DEBIT = TRANSACTION_TYPE_CODES["debit"]
+CREDIT = TRANSACTION_TYPE_CODES["credit"]
+
+
+# Stable across processes and runs, unlike hash() with string hash randomization
+def shard_of(ledger_name, shards):
+    return zlib.crc32(ledger_name.encode("utf-8")) % shards
+
+
+# Phase 1, run in a worker: vote on every leg routed to this shard. Returns the
+# sequence numbers of vouchers this shard refuses: unknown ledger, or an
+# amount TallyPrimeSystem.import_vouchers would reject (non-finite or not > 0).
+def prepare_shard(balances, legs):
+    return {seq for seq, name, _, amount in legs
+            if name not in balances or not math.isfinite(amount) or amount <= 0}
+
+
+# Phase 2, run in a worker: apply the legs of committed vouchers in sequence
+# order, starting from the shard's current balances. Returns, per touched
+# ledger, the final balance and the new postings as packed array bytes.
+def apply_shard(balances, legs, aborted):
+    touched = {}
+    for seq, name, code, amount in legs:
+        if seq in aborted:
+            continue
+        entry = touched.get(name)
+        if entry is None:
+            entry = touched[name] = [balances[name], array('b'), array('d')]
+        entry[0] = entry[0] - amount if code == DEBIT else entry[0] + amount
+        entry[1].append(code)
+        entry[2].append(amount)
+    return {name: (balance, types.tobytes(), amounts.tobytes())
+            for name, (balance, types, amounts) in touched.items()}
+
+
+# Posts vouchers across a ProcessPoolExecutor with ledgers partitioned by hash.
+# Each voucher becomes a debit leg and a credit leg routed to their ledgers'
+# shards; legs keep their input order, so per-ledger ordering is preserved.
+# A voucher whose legs land on two shards commits only when both shards
+# accept it in the prepare phase; otherwise neither leg is applied.
+# The worker pool is started on first use and reused until close().
+class ShardedPostingEngine:
+    def __init__(self, system, workers=None):
+        self.system = system
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    # vouchers: iterable of (voucher_type, amount, from_ledger_name, to_ledger_name)
+    def post_vouchers(self, vouchers):
+        start = time.perf_counter()
+        shards = self.workers
+        shard_cache = {}
+        legs = [[] for _ in range(shards)]
+        count = 0
+        # TallyPro systems with a posting log get every committed voucher appended to it
+        logging = getattr(self.system, "posting_log", None) is not None
+        logged = []
+        for seq, (voucher_type, amount, from_name, to_name) in enumerate(vouchers):
+            if logging:
+                logged.append((voucher_type, amount, from_name, to_name))
+            for name, code in ((from_name, DEBIT), (to_name, CREDIT)):
+                shard = shard_cache.get(name)
+                if shard is None:
+                    shard = shard_cache[name] = shard_of(name, shards)
+                legs[shard].append((seq, name, code, amount))
+            count += 1
+
+        # Every shard gets the balances of the ledgers it owns that this batch touches
+        balances = [{} for _ in range(shards)]
+        for name, shard in shard_cache.items():
+            if name in self.system.ledgers:
+                balances[shard][name] = self.system.ledgers[name].balance
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=shards)
+        aborted = set().union(*self.pool.map(prepare_shard, balances, legs))
+        results = list(self.pool.map(apply_shard, balances, legs, repeat(aborted)))
+
+        if logging:  # Opening records must carry the balances from before this batch
+            self.system.seed_posting_log(name for shard_balances in balances for name in shard_balances)
+        for result in results:
+            for name, (balance, types, amounts) in result.items():
+                self.merge(self.system.ledgers[name], balance, types, amounts)
+        if logging:
+            today = day_ordinal()
+            for seq, voucher in enumerate(logged):
+                if seq not in aborted:
+                    self.system.log_voucher(*voucher, today)
+        if hasattr(self.system, "invalidate_balance_index"):
+            self.system.invalidate_balance_index()
+        if hasattr(self.system, "save_data"):  # Tally.py keeps everything in memory
+            self.system.save_data()
+
+        elapsed = time.perf_counter() - start
+        applied = count - len(aborted)
+        rate = applied / elapsed if elapsed else 0
+        print(f"Posted {applied} vouchers on {shards} shard(s) in {elapsed:.2f} s "
+              f"({rate:,.0f} vouchers/sec), rejected {len(aborted)}.")
+        return applied, sorted(aborted)
+
+    # TallyPro ledgers take the packed bytes directly, dated today; list-based
+    # ledgers (Tally.py) get dicts
+    def merge(self, ledger, balance, types, amounts):
+        if isinstance(ledger.transactions, TransactionLog):
+            today = day_ordinal()
+            ledger.snapshot_before(today, getattr(self.system, "snapshot_period", "month"))
+            ledger.balance = balance
+            log = ledger.transactions
+            log.types.frombytes(types)
+            log.amounts.frombytes(amounts)
+            log.dates.extend(repeat(today, len(log.amounts) - len(log.dates)))
+        else:
+            ledger.balance = balance
+            codes, values = array('b', types), array('d', amounts)
+            ledger.transactions.extend({"type": TRANSACTION_TYPES[code], "amount": value}
+                                       for code, value in zip(codes, values))
+        ledger.dirty = True
@@ -0,0 +1,237 @@
+import mmap
+import os
+import struct
+import time
+from datetime import date
+
+import ledger_codec
+
+# Fixed-width binary posting log. The file is a 16-byte header followed by
+# 24-byte little-endian records:
+#   timestamp     int64   microseconds since the Unix epoch (UTC)
+#   amount        int64   signed paise: credits positive, debits negative
+#   ledger_id     uint32  index into the ledger name table
+#   voucher_type  uint8   index into the voucher type table
+#   (3 pad bytes keep every record 8-byte aligned)
+# Name tables live in a small JSON sidecar ("<path>.names") that also notes
+# how many records it covers. Writers append records; readers mmap the file
+# and, when NumPy is importable, view the records as a structured array
+# without copying them.
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAGIC = b"LMPLOG"
+VERSION = 1
+HEADER = struct.Struct("<6sHII")  # magic, version, record size, reserved
+RECORD = struct.Struct("<qqIB3x")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+MICROS_PER_DAY = 86_400_000_000
+# The names sidecar is rewritten at least once per this many records, which
+# bounds the tail a writer scans when it opens the log
+RESCAN_LIMIT = 1_000_000
+
+if np is not None:
+    RECORD_DTYPE = np.dtype({
+        "names": ["timestamp", "amount", "ledger_id", "voucher_type"],
+        "formats": ["<i8", "<i8", "<u4", "u1"],
+        "offsets": [0, 8, 16, 20],
+        "itemsize": RECORD.size,
+    })
+
+
+def now_micros():
+    return time.time_ns() // 1000
+
+
+# Midnight UTC of a day ordinal, as a log timestamp
+def day_to_micros(day):
+    return (day - EPOCH_ORDINAL) * MICROS_PER_DAY
+
+
+def names_path(path):
+    return path + ".names"
+
+
+# (ledger names, voucher type names, records covered); a name is None for an
+# id that records use but whose name was lost in a crash
+def load_names(path):
+    try:
+        names = ledger_codec.load_file(names_path(path))
+    except FileNotFoundError:
+        return [], [], 0
+    return names["ledgers"], names["voucher_types"], names.get("records", 0)
+
+
+class PostingLogWriter:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0))
+            self.file.flush()  # Readers can open the log as soon as it exists
+        else:
+            # Drop a torn record left at the tail by a crash mid-append
+            size = self.file.tell()
+            whole = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+            if whole != size:
+                self.file.truncate(whole)
+        self.records = (self.file.tell() - HEADER.size) // RECORD.size
+        ledgers, voucher_types, named_records = load_names(path)
+        # A crash between appending records and saving the names leaves ids in
+        # the file that the sidecar does not list. They stay reserved, with no
+        # name, so that a new ledger is never given the id of a lost one.
+        self.names_changed = named_records != self.records
+        self.named_records = min(named_records, self.records)
+        max_ledger_id, max_type_code = self.max_ids(self.named_records)
+        ledgers += [None] * (max_ledger_id + 1 - len(ledgers))
+        voucher_types += [None] * (max_type_code + 1 - len(voucher_types))
+        self.ledger_names = ledgers
+        self.voucher_type_names = voucher_types
+        self.ledgers = {name: i for i, name in enumerate(ledgers) if name is not None}
+        self.voucher_types = {name: i for i, name in enumerate(voucher_types) if name is not None}
+        if self.names_changed:
+            self.flush()
+
+    # Largest ledger id and voucher type code in the records from `start` on
+    def max_ids(self, start):
+        max_ledger_id = max_type_code = -1
+        with open(self.path, "rb") as f:
+            f.seek(HEADER.size + start * RECORD.size)
+            while True:
+                block = f.read(RECORD.size * 65536)
+                if not block:
+                    break
+                for _, _, ledger_id, code in RECORD.iter_unpack(block):
+                    if ledger_id > max_ledger_id:
+                        max_ledger_id = ledger_id
+                    if code > max_type_code:
+                        max_type_code = code
+        return max_ledger_id, max_type_code
+
+    def ledger_id(self, name):
+        ledger_id = self.ledgers.get(name)
+        if ledger_id is None:
+            ledger_id = self.ledgers[name] = len(self.ledger_names)
+            self.ledger_names.append(name)
+            self.names_changed = True
+        return ledger_id
+
+    def voucher_type_code(self, voucher_type):
+        code = self.voucher_types.get(voucher_type)
+        if code is None:
+            if len(self.voucher_type_names) > 255:
+                raise ValueError("A posting log holds at most 256 voucher types")
+            code = self.voucher_types[voucher_type] = len(self.voucher_type_names)
+            self.voucher_type_names.append(voucher_type)
+            self.names_changed = True
+        return code
+
+    # amount_paise is signed: credits positive, debits negative
+    def append(self, ledger_name, amount_paise, voucher_type, timestamp=None):
+        self.file.write(RECORD.pack(now_micros() if timestamp is None else timestamp, amount_paise,
+                                    self.ledger_id(ledger_name), self.voucher_type_code(voucher_type)))
+        self.records += 1
+
+    # rows: iterable of (ledger_name, amount_paise, voucher_type, timestamp)
+    def append_many(self, rows):
+        pack = RECORD.pack
+        payload = b"".join(pack(timestamp, amount, self.ledger_id(name), self.voucher_type_code(voucher_type))
+                           for name, amount, voucher_type, timestamp in rows)
+        self.file.write(payload)
+        self.records += len(payload) // RECORD.size
+
+    # Records reach the file before the names sidecar (temp file + rename),
+    # which is rewritten when names were added or RESCAN_LIMIT records went
+    # by. Readers skip ids that have no name yet.
+    def flush(self):
+        self.file.flush()
+        if self.names_changed or self.records - self.named_records >= RESCAN_LIMIT:
+            tmp_path = names_path(self.path) + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(ledger_codec.dumps({"ledgers": self.ledger_names,
+                                            "voucher_types": self.voucher_type_names,
+                                            "records": self.records}))
+            os.replace(tmp_path, names_path(self.path))
+            self.names_changed = False
+            self.named_records = self.records
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+# Read-only view of a posting log as of when it was opened. Arrays taken from
+# .records point into the mapping and must be dropped before close().
+class PostingLogReader:
+    def __init__(self, path):
+        self.path = path
+        self.ledgers, self.voucher_types, _ = load_names(path)
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, _ = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {VERSION} posting log")
+        self.count = (len(self.map) - HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    # Structured NumPy array over the mapped file; no bytes are copied
+    @property
+    def records(self):
+        return np.frombuffer(self.map, dtype=RECORD_DTYPE, count=self.count, offset=HEADER.size)
+
+    # Unpacked (timestamp, amount, ledger_id, voucher_type) tuples, for use without NumPy
+    def __iter__(self):
+        view = memoryview(self.map)[HEADER.size:HEADER.size + self.count * RECORD.size]
+        try:
+            yield from RECORD.iter_unpack(view)
+        finally:
+            view.release()
+
+    # Net paise per ledger id, for records with timestamp <= through
+    def balance_paise(self, through=None):
+        if np is not None:
+            records = self.records
+            ids, amounts = records["ledger_id"], records["amount"]
+            if through is not None:
+                keep = records["timestamp"] <= through
+                ids, amounts = ids[keep], amounts[keep]
+            # float64 sums are exact while each ledger stays below 2**53 paise
+            totals = np.bincount(ids, weights=amounts, minlength=len(self.ledgers))
+            return np.rint(totals[:len(self.ledgers)]).astype(np.int64)
+        totals = [0] * len(self.ledgers)
+        for timestamp, amount, ledger_id, _ in self:
+            if ledger_id < len(totals) and (through is None or timestamp <= through):
+                totals[ledger_id] += amount
+        return totals
+
+    # {ledger name: balance in rupees}; ids whose name was lost are left out
+    def balances(self, through=None):
+        totals = self.balance_paise(through)
+        return {name: int(total) / 100 for name, total in zip(self.ledgers, totals) if name is not None}
+
+    def close(self):
+        self.map.close()
+
+
+# Set every ledger's balance from the log; works on any mapping of objects
+# with a .balance (Tally.py and TallyPro.py ledgers). Returns how many were set.
+def rebuild_balances(ledgers, path):
+    reader = PostingLogReader(path)
+    try:
+        balances = reader.balances()
+    finally:
+        reader.close()
+    updated = 0
+    for name, balance in balances.items():
+        ledger = ledgers.get(name)
+        if ledger is not None:
+            ledger.balance = balance
+            if hasattr(ledger, "dirty"):
+                ledger.dirty = True
+            updated += 1
+    return updated
@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# Positive balances sit on the account's normal side: debit for these types,
+# credit for everything else (Liability, Income, ...)
+DEBIT_TYPES = ["Asset", "Expense"]
+
+
+# Columnar report engine: account names, types and balances are held as
+# pandas/NumPy columns so every report is a vectorized group-by.
+# Consoleapp, TallyPro and the posting log store every balance as credits
+# minus debits; with credit_minus_debit=True those balances are flipped for
+# debit-normal types so that all balances are on the account's normal side.
+class ReportEngine:
+    def __init__(self, names, types, balances, credit_minus_debit=False):
+        raw = pd.Categorical(types)
+        # Fold "asset", " Asset " etc. into one category without touching every row
+        normalized = pd.Index(raw.categories).str.strip().str.title()
+        categories = normalized.unique()
+        code_map = categories.get_indexer(normalized)
+        codes = np.where(raw.codes >= 0, code_map[raw.codes], -1)
+        account_type = pd.Categorical.from_codes(codes, categories)
+        balances = np.asarray(balances, dtype=np.float64)
+        if credit_minus_debit:
+            balances = np.where(np.asarray(account_type.isin(DEBIT_TYPES)), -balances, balances)
+        self.frame = pd.DataFrame({
+            "account_name": names,
+            "account_type": account_type,
+            "balance": balances,
+        })
+
+    # Build from LedgerMaster.accounts
+    @classmethod
+    def from_ledger_master(cls, ledger):
+        accounts = list(ledger.accounts.values())
+        names = [account.account_name for account in accounts]
+        types = [account.account_type for account in accounts]
+        balances = np.fromiter((account.balance for account in accounts), dtype=np.float64, count=len(accounts))
+        return cls(names, types, balances)
+
+    # Build from the Consoleapp accounts table; db.query also works on pooled databases
+    @classmethod
+    def from_database(cls, db):
+        rows = db.query("SELECT account_name, account_type, balance_paise FROM accounts;").fetchall()
+        names = [row[0] for row in rows]
+        types = [row[1] for row in rows]
+        balances = np.fromiter((row[2] or 0 for row in rows), dtype=np.int64, count=len(rows)) / 100
+        return cls(names, types, balances, credit_minus_debit=True)
+
+    # TallyPro ledgers carry no type, so callers may pass a name -> type mapping
+    @classmethod
+    def from_tally(cls, system, account_types=None):
+        account_types = account_types or {}
+        names = list(system.ledgers.keys())
+        types = [account_types.get(name, "Unclassified") for name in names]
+        balances = np.fromiter((system.ledgers[name].balance for name in names), dtype=np.float64, count=len(names))
+        return cls(names, types, balances, credit_minus_debit=True)
+
+    # Balances summed straight from a binary posting log (posting_log.py);
+    # account_types maps ledger name -> type as for from_tally
+    @classmethod
+    def from_posting_log(cls, path, account_types=None):
+        from posting_log import PostingLogReader
+        account_types = account_types or {}
+        reader = PostingLogReader(path)
+        try:
+            balances = np.asarray(reader.balance_paise(), dtype=np.int64) / 100
+        finally:
+            reader.close()
+        named = [i for i, name in enumerate(reader.ledgers) if name is not None]  # Skip ids whose name was lost
+        names = [reader.ledgers[i] for i in named]
+        types = [account_types.get(name, "Unclassified") for name in names]
+        return cls(names, types, balances[named], credit_minus_debit=True)
+
+    def totals_by_type(self):
+        return self.frame.groupby("account_type", observed=True)["balance"].sum()
+
+    # Debit and credit columns per account type, plus a grand total row
+    def trial_balance(self):
+        account_type = self.frame["account_type"]
+        balance = self.frame["balance"].to_numpy()
+        debit_normal = account_type.isin(DEBIT_TYPES).to_numpy()
+        signed = np.where(debit_normal, balance, -balance)  # Positive means a debit balance
+        report = pd.DataFrame({
+            "account_type": account_type,
+            "debit": np.clip(signed, 0, None),
+            "credit": np.clip(-signed, 0, None),
+        }).groupby("account_type", observed=True).sum()
+        report.loc["Total"] = report.sum()
+        return report
+
+    def profit_and_loss(self):
+        totals = self.totals_by_type()
+        income = float(totals.get("Income", 0.0))
+        expense = float(totals.get("Expense", 0.0))
+        return {"income": income, "expense": expense, "net_profit": income - expense}
+
+    # Assets against liabilities, equity and the current period's profit;
+    # equity is every credit-normal type other than Liability and Income
+    def balance_sheet(self):
+        totals = self.totals_by_type()
+        assets = float(totals.get("Asset", 0.0))
+        liabilities = float(totals.get("Liability", 0.0))
+        equity = float(totals.drop(DEBIT_TYPES + ["Liability", "Income"], errors="ignore").sum())
+        net_profit = self.profit_and_loss()["net_profit"]
+        return {
+            "assets": assets,
+            "liabilities": liabilities,
+            "equity": equity,
+            "net_profit": net_profit,
+            "difference": assets - (liabilities + equity + net_profit),
+        }
+
+
+def print_reports(engine):
+    print("\nTrial Balance")
+    print(engine.trial_balance().to_string())
+    pnl = engine.profit_and_loss()
+    print("\nProfit & Loss")
+    print(f"Income: {pnl['income']}, Expense: {pnl['expense']}, Net Profit: {pnl['net_profit']}")
+    sheet = engine.balance_sheet()
+    print("\nBalance Sheet")
+    print(f"Assets: {sheet['assets']}, Liabilities: {sheet['liabilities']}, Equity: {sheet['equity']}, "
+          f"Net Profit: {sheet['net_profit']}, Difference: {sheet['difference']}")
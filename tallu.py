@@ -1,21 +1,210 @@
+import hashlib
+import importlib.util
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 from datetime import datetime
 
+import instrumentation
+from gst import GstSummary, compute_gst_from_frame
+
+# Uploads larger than this are streamed in chunks instead of loaded whole.
+# Keep it below server.maxUploadSize in .streamlit/config.toml, or the
+# chunked path is never reached.
+LARGE_FILE_BYTES = 200 * 1024 * 1024
+CHUNK_SIZE = 100_000
+PREVIEW_ROWS = 1000
+SALES_DTYPES = {'Item Name': 'category', 'Amount': 'float64', 'HSN Code': 'category'}
+
+# Optional sales register columns used for the GST summary
+GST_RATE_COLUMN = 'GST Rate'
+HSN_COLUMN = 'HSN Code'
+
+# Upload history keeps at most this many bytes of DataFrames in memory
+HISTORY_BUDGET_BYTES = 256 * 1024 * 1024
+
+# Upload history that holds recent DataFrames within a byte budget and spills
+# the least recently used ones to disk, reloading them when they are opened
+class UploadHistory:
+    def __init__(self, budget_bytes=HISTORY_BUDGET_BYTES, spill_dir=None):
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir or tempfile.mkdtemp(prefix="tallu_history_")
+        if spill_dir is None:
+            weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        self.entries = []
+        self.frames = OrderedDict()  # Entry index -> DataFrame, least recently used first
+        self.memory_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, timestamp, filename, df):
+        nbytes = int(df.memory_usage(deep=True).sum())
+        self.entries.append({"timestamp": timestamp, "filename": filename, "bytes": nbytes, "path": None})
+        self.frames[len(self.entries) - 1] = df
+        self.memory_bytes += nbytes
+        self.evict()
+
+    def is_in_memory(self, index):
+        return index in self.frames
+
+    def get(self, index):
+        if index in self.frames:
+            self.frames.move_to_end(index)
+            return self.frames[index]
+        entry = self.entries[index]
+        df = self.read_spilled(entry["path"])
+        self.frames[index] = df
+        self.memory_bytes += entry["bytes"]
+        self.evict()
+        return df
+
+    # Spill least recently used frames until the budget holds, always keeping the newest one
+    def evict(self):
+        while self.memory_bytes > self.budget_bytes and len(self.frames) > 1:
+            index, df = self.frames.popitem(last=False)
+            entry = self.entries[index]
+            if entry["path"] is None:
+                entry["path"] = self.write_spilled(index, df)
+            self.memory_bytes -= entry["bytes"]
+
+    def write_spilled(self, index, df):
+        if importlib.util.find_spec("pyarrow") or importlib.util.find_spec("fastparquet"):
+            path = os.path.join(self.spill_dir, f"entry_{index}.parquet")
+            try:
+                df.to_parquet(path)
+                return path
+            except (ValueError, TypeError, ImportError):
+                pass  # Column names or dtypes Parquet cannot store, fall back to pickle
+        path = os.path.join(self.spill_dir, f"entry_{index}.pkl")
+        df.to_pickle(path)
+        return path
+
+    def read_spilled(self, path):
+        if path.endswith(".parquet"):
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
 # Function to initialize session state
 def init_session_state():
     if 'df' not in st.session_state:
         st.session_state.df = None
     if 'file_history' not in st.session_state:
-        st.session_state.file_history = []
+        st.session_state.file_history = UploadHistory()
+    if 'monthly_turnover' not in st.session_state:
+        st.session_state.monthly_turnover = None
+    if 'item_sales' not in st.session_state:
+        st.session_state.item_sales = None
+    if 'digest' not in st.session_state:
+        st.session_state.digest = None
+    if 'gst_summary' not in st.session_state:
+        st.session_state.gst_summary = None
+
+# Function to stream a large CSV in chunks, keeping only a preview and running aggregates
+def ingest_csv_in_chunks(uploaded_file, chunksize=CHUNK_SIZE):
+    preview = None
+    monthly = None
+    items = None
+    gst_summary = None
+    gst_failed_lines = 0
+    for chunk in pd.read_csv(uploaded_file, chunksize=chunksize, dtype=SALES_DTYPES):
+        if 'Date' in chunk.columns:
+            chunk['Date'] = pd.to_datetime(chunk['Date'], dayfirst=True)
+            month_sums = chunk.groupby(chunk['Date'].dt.to_period('M'))['Amount'].sum()
+            monthly = month_sums if monthly is None else monthly.add(month_sums, fill_value=0)
+        if 'Item Name' in chunk.columns:
+            item_sums = chunk.groupby('Item Name', observed=True)['Amount'].sum()
+            item_sums.index = item_sums.index.astype(str)  # Categories differ between chunks
+            items = item_sums if items is None else items.add(item_sums, fill_value=0)
+        if GST_RATE_COLUMN in chunk.columns:
+            # Bad lines are dropped so one bad cell cannot abort the whole upload.
+            # A chunk that still fails (e.g. text in the rate column) is skipped whole.
+            try:
+                _, chunk_summary = compute_gst_from_frame(chunk, 'Amount', GST_RATE_COLUMN, HSN_COLUMN,
+                                                          drop_invalid=True)
+            except ValueError:
+                gst_failed_lines += len(chunk)
+            else:
+                gst_summary = chunk_summary if gst_summary is None else gst_summary.merge(chunk_summary)
+        if preview is None:
+            preview = chunk.head(PREVIEW_ROWS).copy()
+
+    if gst_failed_lines:
+        gst_summary = gst_summary or GstSummary.empty()
+        gst_summary.skipped_lines += gst_failed_lines
+    monthly_turnover = None
+    if monthly is not None:
+        monthly_turnover = monthly.rename_axis('Month').reset_index(name='Amount')
+    item_sales = None
+    if items is not None:
+        item_sales = items.rename_axis('Item Name').reset_index(name='Amount')
+    return preview, monthly_turnover, item_sales, gst_summary
+
+# Function to hash the uploaded bytes; cached results are keyed by this digest
+def file_digest(uploaded_file):
+    return hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+
+# Function to parse an upload. Whole DataFrames are not cached: the frame
+# lives in session state and in the upload history, whose byte budget bounds
+# it. Large files are cached by content digest, but only as the small preview
+# and aggregates that ingest_large_file returns.
+def load_sales_file(digest, uploaded_file):
+    uploaded_file.seek(0)
+    with instrumentation.measure("tallu.load_sales_file") as span:
+        span.bytes_read = uploaded_file.size
+        if uploaded_file.size > LARGE_FILE_BYTES:
+            return ingest_large_file(digest, uploaded_file)
+        df = pd.read_csv(uploaded_file)
+        if 'Date' in df.columns:
+            df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
+        return df, None, None, None
+
+# Function to stream a large file once per distinct content. The underscore
+# argument is skipped by Streamlit's hasher, so the digest is the cache key.
+@st.cache_data(max_entries=8, show_spinner="Reading sales register...")
+def ingest_large_file(digest, _uploaded_file):
+    return ingest_csv_in_chunks(_uploaded_file)
+
+# Function to compute month-wise turnover once per file content
+@st.cache_data(max_entries=32, show_spinner=False)
+def compute_monthly_turnover(digest, _df):
+    with instrumentation.measure("tallu.compute_monthly_turnover"):
+        months = _df['Date'].dt.to_period('M').rename('Month')
+        return _df.groupby(months)['Amount'].sum().reset_index()
+
+# Function to compute item-wise sales once per file content
+@st.cache_data(max_entries=32, show_spinner=False)
+def compute_item_sales(digest, _df):
+    with instrumentation.measure("tallu.compute_item_sales"):
+        return _df.groupby('Item Name', observed=True)['Amount'].sum().reset_index()
+
+# Function to compute the GST slab and HSN summary once per file content
+@st.cache_data(max_entries=32, show_spinner=False)
+def compute_gst_summary(digest, _df):
+    with instrumentation.measure("tallu.compute_gst_summary"):
+        _, summary = compute_gst_from_frame(_df, 'Amount', GST_RATE_COLUMN, HSN_COLUMN, drop_invalid=True)
+    return summary
 
 # Function to save uploaded CSV file to session state and maintain history
 def save_uploaded_file(uploaded_file):
     if uploaded_file is not None:
-        st.session_state.df = pd.read_csv(uploaded_file)
+        digest = file_digest(uploaded_file)
+        df, monthly_turnover, item_sales, gst_summary = load_sales_file(digest, uploaded_file)
+        st.session_state.digest = digest
+        st.session_state.df = df
+        st.session_state.monthly_turnover = monthly_turnover
+        st.session_state.item_sales = item_sales
+        st.session_state.gst_summary = gst_summary
+        if uploaded_file.size > LARGE_FILE_BYTES:
+            st.info(f"Large file: showing the first {PREVIEW_ROWS} rows, reports use the full file.")
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        st.session_state.file_history.append((timestamp, uploaded_file.name, st.session_state.df))
+        st.session_state.file_history.add(timestamp, uploaded_file.name, st.session_state.df)
 
 # Function to display raw data
 def display_raw_data():
@@ -25,13 +214,16 @@ def display_raw_data():
 
 # Function to convert 'Date' column to datetime format
 def convert_to_datetime():
-    if st.session_state.df is not None and 'Date' in st.session_state.df.columns:
-        st.session_state.df['Date'] = pd.to_datetime(st.session_state.df['Date'], dayfirst=True)
+    df = st.session_state.df
+    if df is not None and 'Date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['Date']):
+        df['Date'] = pd.to_datetime(df['Date'], dayfirst=True)
 
 # Function to group data by 'Item Name' and calculate sales
 def group_by_item_name():
     if st.session_state.df is not None and 'Item Name' in st.session_state.df.columns:
-        item_sales = st.session_state.df.groupby('Item Name')['Amount'].sum().reset_index()
+        item_sales = st.session_state.item_sales
+        if item_sales is None:
+            item_sales = compute_item_sales(st.session_state.digest, st.session_state.df)
         st.write("Item Name-wise Sales Report")
         st.bar_chart(item_sales.set_index('Item Name'))
 
@@ -42,11 +234,10 @@ def group_by_item_name():
 
 # Function to calculate month-wise turnover
 def calculate_monthly_turnover():
+    if st.session_state.monthly_turnover is not None:
+        return st.session_state.monthly_turnover
     if st.session_state.df is not None and 'Date' in st.session_state.df.columns:
-        df = st.session_state.df.copy()
-        df['Month'] = df['Date'].dt.to_period('M')
-        monthly_turnover = df.groupby('Month')['Amount'].sum().reset_index()
-        return monthly_turnover
+        return compute_monthly_turnover(st.session_state.digest, st.session_state.df)
 
 # Function to visualize month-wise turnover with a square box chart
 def visualize_monthly_turnover(monthly_turnover, attractiveness):
@@ -64,16 +255,47 @@ def visualize_monthly_turnover(monthly_turnover, attractiveness):
         fig.update_layout(autosize=True)
         st.plotly_chart(fig)
 
+# Function to display GST totals per slab and per HSN code
+def display_gst_summary():
+    df = st.session_state.df
+    if df is None:
+        return
+    summary = st.session_state.gst_summary
+    if summary is None:
+        if GST_RATE_COLUMN not in df.columns:
+            st.write(f"The sales register has no '{GST_RATE_COLUMN}' column.")
+            return
+        try:
+            summary = compute_gst_summary(st.session_state.digest, df)
+        except ValueError as error:
+            st.error(str(error))
+            return
+    columns = ['Rate %', 'Lines', 'Taxable', 'Tax']
+    st.write("GST by Slab")
+    st.write(pd.DataFrame(summary.slab_rows(), columns=columns))
+    st.write(f"Total tax: {summary.total_tax / 100:,.2f}")
+    if summary.skipped_lines:
+        st.warning(f"{summary.skipped_lines:,} line(s) without an amount or a valid GST rate were left out.")
+    if summary.hsn:
+        st.write("GST by HSN Code")
+        st.write(pd.DataFrame(summary.hsn_rows(), columns=['HSN Code'] + columns[1:]))
+
 # Function to display upload history
 def display_upload_history():
-    if st.session_state.file_history:
+    history = st.session_state.file_history
+    if history:
         st.write("Upload History")
-        for i, (timestamp, filename, df) in enumerate(st.session_state.file_history):
-            st.write(f"Timestamp: {timestamp}, Filename: {filename}")
+        st.write(f"In memory: {history.memory_bytes / 1024 ** 2:,.1f} MB "
+                 f"of {history.budget_bytes / 1024 ** 2:,.0f} MB budget")
+        for i, entry in enumerate(history.entries):
+            filename = entry["filename"]
+            location = "memory" if history.is_in_memory(i) else "disk"
+            st.write(f"Timestamp: {entry['timestamp']}, Filename: {filename}, "
+                     f"Size: {entry['bytes'] / 1024 ** 2:,.1f} MB ({location})")
             if st.button(f"View {filename}", key=f"view_button_{i}"):
-                st.write(df)
+                st.write(history.get(i))
             if st.button(f"Download {filename}", key=f"download_button_{i}"):
-                df.to_csv(f"downloaded_{filename}", index=False)
+                history.get(i).to_csv(f"downloaded_{filename}", index=False)
                 st.write(f"{filename} downloaded")
 
 # Main function
@@ -89,7 +311,7 @@ def main():
         save_uploaded_file(uploaded_file)
 
     # Sidebar menu for navigation
-    menu = ["Raw Data", "Month-wise Turnover", "Item Name-wise Sales", "Upload History"]
+    menu = ["Raw Data", "Month-wise Turnover", "Item Name-wise Sales", "GST Summary", "Upload History"]
     choice = st.sidebar.selectbox("Menu", menu)
 
     # Convert 'Date' column to datetime format
@@ -105,6 +327,8 @@ def main():
             visualize_monthly_turnover(monthly_turnover, attractiveness)
     elif choice == "Item Name-wise Sales":
         group_by_item_name()
+    elif choice == "GST Summary":
+        display_gst_summary()
     elif choice == "Upload History":
         display_upload_history()
 
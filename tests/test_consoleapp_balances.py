@@ -0,0 +1,40 @@
+import sqlite3
+
+import pytest
+
+from Consoleapp import Account, Database
+
+
+@pytest.fixture(params=[False, True], ids=["direct", "pooled"])
+def db(request, tmp_path):
+    db = Database(str(tmp_path / "ledger.db"), pooled=request.param, verbose=False)
+    yield db
+    db.close()
+
+
+# 1.005 is 1.00499... in binary: the stored and expected opening paise must
+# both round the decimal value
+def test_fresh_account_verifies(db):
+    accounts = Account(db)
+    accounts.create_account("odd", "Asset", 1.005)
+
+    assert accounts.verify_balances() == []
+    accounts.rebuild_balances()
+    assert db.query("SELECT balance_paise FROM accounts;").fetchone()[0] == 101
+
+
+def test_migrated_balances_round_like_new_ones(tmp_path):
+    path = str(tmp_path / "old.db")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE accounts (account_name TEXT PRIMARY KEY, account_type TEXT, balance REAL);")
+    connection.execute("INSERT INTO accounts VALUES ('odd', 'Asset', 1.005);")
+    connection.commit()
+    connection.close()
+
+    db = Database(path, verbose=False)
+    try:
+        row = db.query("SELECT balance_paise, opening_balance_paise FROM accounts;").fetchone()
+        assert tuple(row) == (101, 101)
+        assert Account(db).verify_balances() == []
+    finally:
+        db.close()
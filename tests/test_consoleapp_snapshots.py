@@ -0,0 +1,46 @@
+from datetime import date, timedelta
+
+import pytest
+
+from Consoleapp import Account, Database, Voucher
+
+
+@pytest.fixture(params=[False, True], ids=["direct", "pooled"])
+def db(request, tmp_path):
+    db = Database(str(tmp_path / "ledger.db"), pooled=request.param, verbose=False)
+    yield db
+    db.close()
+
+
+def test_snapshot_balances_records_the_period_end(db):
+    accounts = Account(db)
+    accounts.create_account("cash", "Asset", 100)
+    accounts.create_account("sales", "Income", 0)
+    assert Voucher(db).post_voucher("V1", "Sales", 40, "cash", "sales")
+    yesterday = (date.today() - timedelta(days=1)).isoformat()
+
+    assert accounts.snapshot_balances(yesterday)
+
+    rows = db.query("SELECT account_name, period_end, balance_paise FROM balance_snapshots "
+                    "ORDER BY account_name;").fetchall()
+    assert [tuple(row) for row in rows] == [("cash", yesterday, 10000), ("sales", yesterday, 0)]
+    assert accounts.balance_as_of("cash", yesterday) == 100
+    assert accounts.balance_as_of("cash", date.today().isoformat()) == 60
+
+
+# Dates compare as text, so an unpadded date would match the wrong snapshot
+def test_unpadded_dates_are_rejected(db):
+    accounts = Account(db)
+    accounts.create_account("cash", "Asset", 100)
+    with pytest.raises(ValueError):
+        accounts.balance_as_of("cash", "2024-3-5")
+    with pytest.raises(ValueError):
+        accounts.snapshot_balances("2024-3-5")
+
+
+def test_quiet_database_prints_nothing(db, capsys):
+    accounts = Account(db)
+    accounts.create_account("cash", "Asset", 100)
+    assert not accounts.snapshot_balances(date.today().isoformat())
+    assert accounts.snapshot_balances((date.today() - timedelta(days=1)).isoformat())
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,39 @@
+import math
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from gst import GstSummary, compute_gst, compute_gst_from_frame
+
+
+def test_missing_rate_raises_a_clear_error():
+    with pytest.raises(ValueError, match="no GST rate"):
+        compute_gst([100.0, 200.0], [18, math.nan])
+
+
+def test_drop_invalid_skips_blank_and_non_slab_rates():
+    frame = pd.DataFrame({"Amount": [100.0, 200.0, 300.0, math.nan], "GST Rate": [18, math.nan, 7, 5]})
+    tax, summary = compute_gst_from_frame(frame, drop_invalid=True)
+    assert tax.tolist() == [1800]
+    assert summary.skipped_lines == 3
+    assert summary.total_tax == 1800
+
+
+def test_merge_adds_skipped_lines():
+    frame = pd.DataFrame({"Amount": [100.0, 200.0], "GST Rate": [12, math.nan]})
+    _, summary = compute_gst_from_frame(frame, drop_invalid=True)
+    merged = GstSummary.empty().merge(summary).merge(summary)
+    assert merged.skipped_lines == 2
+    assert merged.total_tax == 2400
+
+
+# Batch tax is in rupees, the same unit as Tax.calculate_tax
+def test_ledger_master_batch_tax_is_in_rupees():
+    from LedgerMaster import Tax
+
+    tax = Tax(18)
+    batch, summary = tax.calculate_batch([100.0, 250.5])
+    assert batch.tolist() == [18.0, 45.09]
+    assert batch[0] == tax.calculate_tax(100.0)
+    assert summary.total_tax == 6309
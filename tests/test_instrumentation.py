@@ -0,0 +1,27 @@
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_with(env, cwd):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT, **env)
+    env.pop("LEDGER_METRICS", None)
+    return subprocess.run([sys.executable, "-c", "import instrumentation; print(instrumentation.TRACEMALLOC_FRAMES)"],
+                          env=env, cwd=cwd, capture_output=True, text=True, check=True)
+
+
+def test_bad_tracemalloc_value_warns_and_stays_off(tmp_path):
+    result = run_with({"LEDGER_TRACEMALLOC": "yes"}, tmp_path)
+    assert result.stdout.strip() == "0"
+    assert "LEDGER_TRACEMALLOC" in result.stderr
+    assert not (tmp_path / "tracemalloc.json").exists()
+
+
+# Tracing without LEDGER_METRICS still writes its results at exit
+def test_tracemalloc_alone_is_dumped(tmp_path):
+    run_with({"LEDGER_TRACEMALLOC": "5"}, tmp_path)
+    data = json.loads((tmp_path / "tracemalloc.json").read_text())
+    assert data["tracemalloc"]["peak_bytes"] > 0
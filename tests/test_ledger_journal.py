@@ -0,0 +1,29 @@
+import contextlib
+import io
+
+from LedgerMaster import LedgerMaster
+
+
+def open_ledger(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return LedgerMaster(str(path), journal=True, compact_every=10 ** 9)
+
+
+# Mutations made after recovering from a torn journal tail survive the next restart
+def test_torn_journal_tail_keeps_later_records(tmp_path):
+    path = tmp_path / "ledger_data.json"
+    ledger = open_ledger(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ledger.create_account("a", "Asset", 10.0)
+        ledger.credit_account("a", 5.0)
+    ledger.close()
+    with open(ledger.journal_name, "ab") as f:
+        f.write(b'{"op": "balance", "name": "a", "bal')  # Crash mid-append
+
+    ledger = open_ledger(path)
+    assert ledger.accounts["a"].balance == 15.0
+    with contextlib.redirect_stdout(io.StringIO()):
+        ledger.credit_account("a", 100.0)
+    ledger.close()
+
+    assert open_ledger(path).accounts["a"].balance == 115.0
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from ledger_service import LedgerService
+
+
+@pytest.fixture
+def service(tmp_path):
+    service = LedgerService(str(tmp_path / "ledger.db"), workers=2)
+    yield service
+    service.close()
+
+
+# Sends each line on one connection and returns the decoded responses
+def exchange(service, lines):
+    async def run():
+        server = await asyncio.start_server(service.handle_client, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for line in lines:
+            writer.write(line + b"\n")
+            await writer.drain()
+            responses.append(json.loads(await reader.readline()))
+        writer.close()
+        server.close()
+        await server.wait_closed()
+        return responses
+    return asyncio.run(run())
+
+
+def test_errors_are_responses_and_keep_the_connection(service):
+    responses = exchange(service, [
+        b'{"jsonrpc": "2.0", "id": 1, "method": "account.create", "params": ["cash", "Asset", 0]}',
+        b'{"jsonrpc": "2.0", "id": 2, "method": "account.credit", "params": ["cash", "abc"]}',
+        b'[1, 2, 3]',
+        b'"just a string"',
+        b'{"jsonrpc": "2.0", "id": 3, "method": ["account.balance"]}',
+        b'{"jsonrpc": "2.0", "id": 4, "method": "account.balance", "params": "cash"}',
+        b'\xff\xfe',
+        b'{"jsonrpc": "2.0", "id": 5, "method": "account.balance", "params": ["cash"]}',
+    ])
+    assert responses[0]["result"] is None
+    assert responses[1]["error"]["code"] == -32603
+    assert responses[2]["error"]["code"] == -32600
+    assert responses[3]["error"]["code"] == -32600
+    assert responses[4]["error"]["code"] == -32601
+    assert responses[5]["error"]["code"] == -32602
+    assert responses[6]["error"]["code"] == -32700
+    assert responses[7]["result"] == 0
+
+
+# Arguments that do not fit the method are -32602; a TypeError raised inside
+# the method body is an internal error
+def test_only_binding_failures_are_invalid_params(service):
+    def broken(name):
+        return len(None)
+    service.methods["test.broken"] = broken
+    responses = exchange(service, [
+        b'{"jsonrpc": "2.0", "id": 1, "method": "account.balance", "params": ["cash", "extra"]}',
+        b'{"jsonrpc": "2.0", "id": 2, "method": "inventory.list", "params": {"colour": "red"}}',
+        b'{"jsonrpc": "2.0", "id": 3, "method": "test.broken", "params": ["x"]}',
+        b'{"jsonrpc": "2.0", "id": 4, "method": "inventory.list", "params": {"page_size": 10}}',
+    ])
+    assert responses[0]["error"]["code"] == -32602
+    assert responses[1]["error"]["code"] == -32602
+    assert responses[2]["error"]["code"] == -32603
+    assert responses[3]["result"] == {"rows": [], "next": None}
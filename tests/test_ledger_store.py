@@ -0,0 +1,33 @@
+import contextlib
+import io
+import os
+
+from TallyPro import Ledger, LedgerStore, TallyPrimeSystem
+
+
+# Names whose hex form would exceed NAME_MAX are stored under a hash and
+# still listed and loaded by name
+def test_long_ledger_name_round_trips(tmp_path):
+    directory = str(tmp_path / "ledgers")
+    name = "Sundry Creditors - " + "x" * 300
+    store = LedgerStore(directory)
+    store[name] = Ledger(name, 12.5)
+    store["short"] = Ledger("short")
+    assert store.flush() == 2
+
+    store = LedgerStore(directory)
+    assert sorted(store) == sorted([name, "short"])
+    assert name in store
+    assert store[name].balance == 12.5
+    assert not [entry for entry in os.listdir(directory) if entry.endswith(".tmp")]
+
+
+def test_single_file_save_replaces_atomically(tmp_path):
+    path = tmp_path / "tally.json"
+    with contextlib.redirect_stdout(io.StringIO()):
+        system = TallyPrimeSystem(str(path))
+        system.create_ledger("a")
+        system.create_ledger("b")
+        reloaded = TallyPrimeSystem(str(path))
+    assert sorted(reloaded.ledgers) == ["a", "b"]
+    assert not (tmp_path / "tally.json.tmp").exists()
@@ -0,0 +1,59 @@
+import contextlib
+import io
+import time
+
+from LedgerMaster import LedgerMaster
+
+
+def open_ledger(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return LedgerMaster(str(path), write_behind=True, flush_interval_ms=10)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def saved_accounts(path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return LedgerMaster(str(path)).accounts
+
+
+def test_mutation_is_flushed_after_the_interval(tmp_path):
+    path = tmp_path / "ledger_data.json"
+    ledger = open_ledger(path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ledger.create_account("a", "Asset", 10.0)
+
+    wait_for(lambda: not ledger.dirty)
+    assert saved_accounts(path)["a"].balance == 10.0
+    ledger.close()
+
+
+# A failing write is retried on a later tick instead of stopping the flusher
+def test_failed_write_does_not_stop_later_flushes(tmp_path):
+    path = tmp_path / "ledger_data.json"
+    ledger = open_ledger(path)
+    write_snapshot = ledger.write_snapshot
+    failures = []
+
+    def failing_write():
+        if not failures:
+            failures.append(1)
+            raise OSError(28, "No space left on device")
+        return write_snapshot()
+    ledger.write_snapshot = failing_write
+
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        ledger.create_account("a", "Asset", 10.0)
+        wait_for(lambda: failures and not ledger.dirty)
+        assert ledger.flusher.is_alive()
+        assert ledger.flush_error is None
+        ledger.credit_account("a", 5.0)
+        wait_for(lambda: not ledger.dirty)
+
+    assert saved_accounts(path)["a"].balance == 15.0
+    ledger.close()
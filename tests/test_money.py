@@ -0,0 +1,26 @@
+import random
+
+import pytest
+
+import money
+
+np = pytest.importorskip("numpy")
+
+TIES = [1.005, 0.145, 2.675, -1.005, -0.145, 1.015, 10.005, 12345678.905, 0.005, -0.005]
+
+
+@pytest.mark.parametrize("value", TIES)
+def test_to_paise_rounds_decimal_ties_half_away_from_zero(value):
+    assert money.to_paise(value) == money.to_paise(repr(value))
+
+
+def test_numpy_column_matches_to_paise():
+    rng = random.Random(1)
+    values = TIES + [rng.randrange(-10 ** 9, 10 ** 9) / 1000 for _ in range(20_000)]
+    assert money.paise_column(values).tolist() == [money.to_paise(value) for value in values]
+
+
+def test_fallback_column_matches_numpy(monkeypatch):
+    expected = money.paise_column(TIES).tolist()
+    monkeypatch.setattr(money, "np", None)
+    assert list(money.paise_column(TIES)) == expected
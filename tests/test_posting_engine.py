@@ -0,0 +1,28 @@
+import contextlib
+import io
+
+from posting_engine import DEBIT, ShardedPostingEngine, prepare_shard
+from TallyPro import TallyPrimeSystem
+
+
+# Same amount rules as TallyPrimeSystem.import_vouchers
+def test_prepare_rejects_non_positive_and_non_finite_amounts():
+    legs = [(seq, "a", DEBIT, amount) for seq, amount in enumerate([10.0, 0.0, -5.0, float("nan"), float("inf")])]
+    assert prepare_shard({"a": 0.0}, legs) == {1, 2, 3, 4}
+
+
+def test_engine_reuses_its_pool(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        system = TallyPrimeSystem(str(tmp_path / "tally.json"))
+        system.create_ledger("a")
+        system.create_ledger("b")
+        engine = ShardedPostingEngine(system, workers=2)
+        try:
+            assert engine.post_vouchers([("J", 10.0, "a", "b"), ("J", -1.0, "a", "b")]) == (1, [1])
+            pool = engine.pool
+            assert engine.post_vouchers([("J", 5.0, "b", "a")]) == (1, [])
+            assert engine.pool is pool
+        finally:
+            engine.close()
+    assert system.ledgers["a"].balance == -5.0
+    assert system.ledgers["b"].balance == 5.0
@@ -0,0 +1,75 @@
+import posting_log
+from posting_log import PostingLogReader, PostingLogWriter
+
+
+# Records whose names never reached the sidecar keep their ids reserved
+def test_ids_lost_in_a_crash_are_not_reused(tmp_path):
+    path = str(tmp_path / "postings.log")
+    writer = PostingLogWriter(path)
+    writer.append("Y", 7, "Opening", 0)
+    writer.flush()
+    writer.append("X", 500, "Journal", 1)
+    writer.file.flush()  # Records reach the disk, then the process dies before flush()
+    writer.file.close()
+
+    writer = PostingLogWriter(path)
+    writer.append("Z", 300, "Journal", 2)
+    writer.close()
+
+    reader = PostingLogReader(path)
+    try:
+        assert reader.balances() == {"Y": 0.07, "Z": 3.0}
+    finally:
+        reader.close()
+
+
+def test_reopen_scans_only_records_after_the_names(tmp_path, monkeypatch):
+    path = str(tmp_path / "postings.log")
+    writer = PostingLogWriter(path)
+    writer.append_many(("L%d" % i, i, "Journal", i) for i in range(100))
+    writer.close()
+
+    starts = []
+    real_max_ids = PostingLogWriter.max_ids
+    monkeypatch.setattr(PostingLogWriter, "max_ids", lambda self, start: starts.append(start) or real_max_ids(self, start))
+    writer = PostingLogWriter(path)
+    assert starts == [100] and not writer.names_changed
+    writer.close()
+
+
+def test_rebuild_skips_unnamed_ids(tmp_path):
+    path = str(tmp_path / "postings.log")
+    writer = PostingLogWriter(path)
+    writer.append("A", 100, "Opening", 0)
+    writer.append("B", 200, "Opening", 0)
+    writer.file.flush()
+    writer.file.close()
+
+    class Ledger:
+        balance = 0.0
+    ledgers = {"A": Ledger()}
+    assert posting_log.rebuild_balances(ledgers, path) == 0
+
+
+def test_tally_seeds_opening_records_lazily(tmp_path):
+    import contextlib
+    import io
+
+    from TallyPro import TallyPrimeSystem
+
+    filename, ledger_dir = str(tmp_path / "tally.json"), str(tmp_path / "ledgers")
+    log_path = str(tmp_path / "postings.log")
+    with contextlib.redirect_stdout(io.StringIO()):
+        system = TallyPrimeSystem(filename, ledger_dir=ledger_dir)
+        for name in ("a", "b", "c"):
+            system.create_ledger(name)
+        system.create_voucher("Journal", 25, "a", "b")  # Before the log exists
+        system.close()
+
+        system = TallyPrimeSystem(filename, ledger_dir=ledger_dir, posting_log_path=log_path)
+        assert not system.ledgers.loaded  # Opening the log read no ledgers
+        system.create_voucher("Journal", 10, "b", "c")
+        system.ledgers["a"].balance = 999.0  # Never logged, so a rebuild leaves it alone
+        system.rebuild_balances_from_log()
+
+    assert [system.ledgers[name].balance for name in "abc"] == [999.0, 15.0, 10.0]
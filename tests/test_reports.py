@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip("pandas")
+
+from Consoleapp import Account, Database, Voucher
+from reports import ReportEngine
+
+
+@pytest.fixture(params=[False, True], ids=["direct", "pooled"])
+def db(request, tmp_path):
+    db = Database(str(tmp_path / "ledger.db"), pooled=request.param, verbose=False)
+    yield db
+    db.close()
+
+
+# One voucher debits an asset and credits income: the trial balance agrees
+# and both show on their normal side
+def test_one_voucher_balances(db):
+    accounts = Account(db)
+    accounts.create_account("cash", "Asset", 0)
+    accounts.create_account("sales", "Income", 0)
+    assert Voucher(db).post_voucher("V1", "Sales", 100, "cash", "sales")
+
+    engine = ReportEngine.from_database(db)
+    trial = engine.trial_balance()
+    assert trial.loc["Total", "debit"] == trial.loc["Total", "credit"] == 100
+    assert trial.loc["Asset", "debit"] == 100
+    assert trial.loc["Income", "credit"] == 100
+    assert engine.profit_and_loss() == {"income": 100, "expense": 0, "net_profit": 100}
+    sheet = engine.balance_sheet()
+    assert sheet["assets"] == 100
+    assert sheet["difference"] == 0
+
+
+def test_expense_debit_is_positive_expense(db):
+    accounts = Account(db)
+    accounts.create_account("rent", "Expense", 0)
+    accounts.create_account("bank", "Asset", 0)
+    accounts.create_account("capital", "Equity", 0)
+    voucher = Voucher(db)
+    assert voucher.post_voucher("V1", "Receipt", 500, "bank", "capital")
+    assert voucher.post_voucher("V2", "Payment", 200, "rent", "bank")
+
+    engine = ReportEngine.from_database(db)
+    assert engine.profit_and_loss()["expense"] == 200
+    trial = engine.trial_balance()
+    assert trial.loc["Total", "debit"] == trial.loc["Total", "credit"] == 500
+    sheet = engine.balance_sheet()
+    assert sheet["equity"] == 500
+    assert sheet["difference"] == 0
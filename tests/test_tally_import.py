@@ -0,0 +1,45 @@
+import contextlib
+import io
+
+from TallyPro import TallyPrimeSystem
+
+
+def test_import_rejects_non_finite_and_non_positive_amounts(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        system = TallyPrimeSystem(str(tmp_path / "tally.json"))
+        system.create_ledger("a")
+        system.create_ledger("b")
+    path = tmp_path / "vouchers.csv"
+    path.write_text("voucher_type,amount,from_ledger,to_ledger\n"
+                    "J,nan,a,b\nJ,inf,a,b\nJ,-5,a,b\nJ,0,a,b\nJ,10,a,b\n")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        imported, rejected = system.import_vouchers(str(path))
+
+    assert imported == 1
+    assert [line for line, _ in rejected] == [2, 3, 4, 5]
+    assert system.ledgers["a"].balance == -10.0
+    assert system.ledgers["b"].balance == 10.0
+
+
+# With the per-ledger store, a short CSV row (None ledger) and a JSONL row
+# with a numeric ledger name are rejected instead of aborting the import
+def test_import_rejects_non_string_ledger_names(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        system = TallyPrimeSystem(str(tmp_path / "tally.json"), ledger_dir=str(tmp_path / "ledgers"))
+        system.create_ledger("a")
+        system.create_ledger("b")
+    csv_path = tmp_path / "vouchers.csv"
+    csv_path.write_text("voucher_type,amount,from_ledger,to_ledger\nJ,5,a\nJ,10,a,b\n")
+    jsonl_path = tmp_path / "vouchers.jsonl"
+    jsonl_path.write_text('{"voucher_type": "J", "amount": 5, "from_ledger": 7, "to_ledger": "b"}\n'
+                          '{"voucher_type": "J", "amount": 1, "from_ledger": "a", "to_ledger": "b"}\n')
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert [line for line, _ in system.import_vouchers(str(csv_path))[1]] == [2]
+        assert [line for line, _ in system.import_vouchers(str(jsonl_path))[1]] == [1]
+
+    assert 7 not in system.ledgers
+    assert system.ledgers.get(None) is None
+    assert system.ledgers["a"].balance == -11.0
+    assert system.ledgers["b"].balance == 11.0
@@ -0,0 +1,30 @@
+import contextlib
+import io
+import os
+
+from TallyPro import TallyPrimeSystem
+
+
+def open_system(tmp_path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return TallyPrimeSystem(str(tmp_path / "tally.json"), ledger_dir=str(tmp_path / "ledgers"))
+
+
+# Startup does not list the ledger directory; the first search does
+def test_name_index_is_built_on_first_search(tmp_path, monkeypatch):
+    system = open_system(tmp_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for name in ("cash", "capital", "sales"):
+            system.create_ledger(name)
+
+    scans = []
+    real_scandir = os.scandir
+    monkeypatch.setattr(os, "scandir", lambda path: scans.append(path) or real_scandir(path))
+    system = open_system(tmp_path)
+    assert system.name_index is None and not scans
+
+    assert system.search_ledgers("ca") == ["capital", "cash"]
+    assert len(scans) == 1
+    with contextlib.redirect_stdout(io.StringIO()):
+        system.create_ledger("cards")
+    assert system.search_ledgers("ca") == ["capital", "cards", "cash"]